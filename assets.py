@@ -0,0 +1,345 @@
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import pygame
+
+"""
+This is the Asset Cache Module
+Decoding a PNG from disk every time a screen is shown is the slowest thing the game does, so every
+surface the game draws goes through a SurfaceCache first.
+
+The SurfaceCache class is a bounded least-recently-used (LRU) cache of pygame surfaces. The bound is the
+number of bytes of pixel data held, not the number of entries, so one 600x400 background costs as much
+as about four 236x236 scenario pictures. Images are keyed by their normalised path so that
+"graphics/dinner.png" and "graphics//dinner.png" share one entry.
+
+Example:
+cache = SurfaceCache(max_bytes=8 * 1024 * 1024)
+cache.preload(["graphics/dinner.png", "graphics/relax.png"])
+surface = cache.load_image("graphics/dinner.png")
+print(cache.stats())  # {'hits': 1, 'misses': 2, 'evictions': 0, ...}
+
+Text goes through the same machinery. get_font() keeps one pygame Font per (family, size) so the system
+font lookup done by SysFont happens once per game, and render_text() memoises rendered lines in a shared
+SurfaceCache so static strings such as captions and button labels are rasterised only once.
+
+Pictures can also come from a texture atlas built by build_atlas.py: a few large sheets holding every picture
+plus a manifest of where each one is. The Atlas class decodes each sheet once and hands out subsurfaces, which
+share the sheet's pixels, so the game opens a single file and its image memory is known up front.
+"""
+
+IMAGE_CACHE_BYTES = 8 * 1024 * 1024
+TEXT_CACHE_BYTES = 4 * 1024 * 1024
+ATLAS_DIR = os.path.join("graphics", "atlas")
+ATLAS_MANIFEST = os.path.join(ATLAS_DIR, "manifest.json")
+ASSET_LOADED = pygame.USEREVENT + 2  # posted by AssetLoader when a picture has been decoded
+
+
+def normalise_path(path: str) -> str:
+    """
+    Turn a file path into the key used by the caches
+
+    Args:
+    -path: A relative or absolute file path
+
+    Returns:
+    -key: The path with redundant separators and "." parts removed, in the platform's case convention
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def surface_bytes(surface) -> int:
+    """Returns the number of bytes of pixel data held by a surface."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SurfaceCache:
+    def __init__(self, max_bytes=IMAGE_CACHE_BYTES):
+        """
+        Initialise an empty cache
+
+        Args:
+        -max_bytes: The largest amount of pixel data the cache may hold before it evicts entries
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (surface, size in bytes), oldest first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, loader):
+        """
+        Return the cached surface for key, calling loader() to build it on a miss
+
+        Args:
+        -key: Any hashable value identifying the surface
+        -loader: A function with no arguments that returns the surface
+
+        Returns:
+        -surface: The cached or newly built surface
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        surface = loader()
+        self.put(key, surface)
+        return surface
+
+    def put(self, key, surface) -> None:
+        """
+        Store a surface, evicting the least recently used entries until it fits.
+        Surfaces bigger than the whole budget are returned to the caller but never stored.
+        """
+        size = surface_bytes(surface)
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return None
+
+        while self._entries and self.current_bytes + size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+        self._entries[key] = (surface, size)
+        self.current_bytes += size
+        return None
+
+    def load_image(self, image_path: str):
+        """Returns the display-format surface for an image file, decoding it only on a cache miss."""
+        return self.get(
+            normalise_path(image_path),
+            lambda: pygame.image.load(image_path).convert(),
+        )
+
+    def preload(self, image_paths) -> None:
+        """Decodes every image in image_paths ahead of time so that drawing them later is a cache hit."""
+        for image_path in image_paths:
+            self.load_image(image_path)
+        return None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+        return None
+
+    def stats(self) -> dict:
+        """Returns the cache counters, e.g. for logging."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Shared by every Game and Button in the process
+_fonts = {}
+text_cache = SurfaceCache(max_bytes=TEXT_CACHE_BYTES)
+
+
+def get_font(family: str, size: int):
+    """
+    Return the shared font for a family and size, looking it up with SysFont only the first time
+
+    Args:
+    -family: The system font name, e.g. "monospace"
+    -size: The font size
+
+    Returns:
+    -font: A pygame.font.Font
+    """
+    key = (family, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(family, size)
+        _fonts[key] = font
+    return font
+
+
+def render_text(text: str, text_color, bg_color=None, font="comic sans", size=12):
+    """
+    Return an antialiased surface of a single line of text, rendering it only on a cache miss.
+    The returned surface is shared, so callers must blit it rather than draw on it.
+    """
+    return text_cache.get(
+        (text, text_color, bg_color, font, size),
+        lambda: get_font(font, size).render(text, True, text_color, bg_color),
+    )
+
+
+def clear_font_cache() -> None:
+    """Drops every font and rendered line, e.g. after pygame.quit() has invalidated them."""
+    _fonts.clear()
+    text_cache.clear()
+    return None
+
+
+def atlas_name(path: str) -> str:
+    """Returns the name of a picture in the atlas, its file name without extension, e.g. "Graphics/Dinner.png" -> "dinner"."""
+    return os.path.splitext(os.path.basename(path))[0].lower()
+
+
+class Atlas:
+    def __init__(self, manifest_path=ATLAS_MANIFEST):
+        """
+        Read an atlas manifest. If there is none, because build_atlas.py has not been run, the atlas is empty
+        and get() always returns None.
+
+        Args:
+        -manifest_path: The manifest written by build_atlas.py
+        """
+        self.directory = os.path.dirname(manifest_path)
+        try:
+            with open(manifest_path, encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            manifest = {"sheets": [], "images": {}}
+        self.sheet_files = [sheet["file"] for sheet in manifest["sheets"]]
+        self.entries = manifest["images"]  # name -> {"sheet": number, "rect": [x, y, width, height]}
+        self._sheets = {}  # sheet number -> decoded sheet
+        self._images = {}  # name -> subsurface of its sheet
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return atlas_name(path) in self.entries
+
+    def _sheet(self, number: int):
+        sheet = self._sheets.get(number)
+        if sheet is None:
+            sheet = pygame.image.load(os.path.join(self.directory, self.sheet_files[number])).convert()
+            self._sheets[number] = sheet
+        return sheet
+
+    def get(self, path: str):
+        """Returns the picture for path as a subsurface of its sheet, or None if it is not in the atlas."""
+        name = atlas_name(path)
+        image = self._images.get(name)
+        if image is None:
+            entry = self.entries.get(name)
+            if entry is None:
+                return None
+            image = self._sheet(entry["sheet"]).subsurface(pygame.Rect(entry["rect"]))
+            self._images[name] = image
+        return image
+
+    def stats(self) -> dict:
+        return {
+            "images": len(self.entries),
+            "sheets": len(self.sheet_files),
+            "sheets_loaded": len(self._sheets),
+            "bytes": sum(surface_bytes(sheet) for sheet in self._sheets.values()),
+        }
+
+
+"""
+The AssetLoader class decodes pictures on a small pool of worker threads while the game shows something
+else, such as the title and instruction screens. pygame releases the GIL while it decodes a file, so the
+main loop keeps running.
+
+Surfaces are only converted to the display's pixel format, and only put in a SurfaceCache, on the main thread.
+A worker posts ASSET_LOADED when it finishes, which wakes the main loop, and the game then calls collect()
+to hand every finished picture to its cache. Text is not rendered on the workers because pygame fonts are not
+safe to use from several threads; it is rasterised on the main thread when the game is idle instead.
+
+Example:
+loader = AssetLoader()
+loader.request(["graphics/dinner.png", "graphics/relax.png"])
+...  # on ASSET_LOADED
+loader.collect(cache)
+surface = cache.load_image("graphics/dinner.png")  # a cache hit
+"""
+
+
+class AssetLoader:
+    def __init__(self, workers=2):
+        """
+        Args:
+        -workers: The number of decoding threads, started on the first request
+        """
+        self.workers = workers
+        self.loaded = 0
+        self.failed = 0
+        self._executor = None
+        self._pending = {}  # normalised path -> Future of the decoded surface
+
+    def __len__(self):
+        return len(self._pending)
+
+    def request(self, image_paths) -> None:
+        """Starts decoding every image in image_paths that is not already being decoded."""
+        for image_path in image_paths:
+            key = normalise_path(image_path)
+            if key in self._pending:
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="AssetLoader")
+            future = self._executor.submit(pygame.image.load, image_path)
+            future.add_done_callback(self._notify)
+            self._pending[key] = future
+        return None
+
+    @staticmethod
+    def _notify(future) -> None:
+        """Runs on the worker thread that decoded the picture."""
+        try:
+            pygame.event.post(pygame.event.Event(ASSET_LOADED))
+        except pygame.error:  # the display was closed while the picture was decoding
+            pass
+        return None
+
+    def collect(self, cache: SurfaceCache, wait_for_all=False) -> int:
+        """
+        Convert the finished pictures and put them in cache. Call on the main thread.
+
+        Args:
+        -cache: The SurfaceCache the pictures are loaded through later
+        -wait_for_all: Wait for the pictures still decoding instead of leaving them for a later call
+
+        Returns:
+        -collected: The number of pictures put in the cache
+        """
+        if wait_for_all and self._pending:
+            wait(list(self._pending.values()))
+        collected = 0
+        for key, future in list(self._pending.items()):
+            if not future.done():
+                continue
+            del self._pending[key]
+            try:
+                surface = future.result()
+            except (pygame.error, OSError):  # left for load_image() on the main thread to report
+                self.failed += 1
+                continue
+            cache.put(key, surface.convert())
+            collected += 1
+        self.loaded += collected
+        return collected
+
+    def close(self) -> None:
+        """Drops the pictures that have not started decoding and lets the workers finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+        return None
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "pending": len(self._pending), "loaded": self.loaded, "failed": self.failed}
@@ -0,0 +1,100 @@
+import pygame
+
+"""
+This is the Audio Module
+Background tracks are long, so they are streamed from disk with pygame.mixer.music instead of being decoded
+into pygame.mixer.Sound objects up front. Nothing is read until a track starts, which keeps the large WAV
+files out of memory and out of the game's startup time.
+
+pygame can only stream one track at a time, so switching tracks is a crossfade in two halves: the playing
+track fades out, and when it has stopped pygame posts MUSIC_END, on which the next track fades in.
+Game.handle_events passes MUSIC_END to MusicPlayer.on_music_end().
+
+Short cues, like the sounds for gaining and losing luck, are small enough to keep as preloaded Sounds so they
+can play immediately and on top of the music.
+
+The audio device is opened, and the cues are loaded, the first time anything is played or stopped rather than
+when the MusicPlayer is created, so the start screen does not wait for the mixer.
+
+Example:
+music = MusicPlayer({"luck_added": "audio/luck_added.wav"})
+music.play(INTRO_MUSIC, loops=6)
+music.play(END_MUSIC)  # fades the intro out, then the end music in
+music.cue("luck_added")
+"""
+
+INTRO_MUSIC = "audio/intro.wav"
+END_MUSIC = "audio/not-really-lost.wav"
+CUES = {"luck_added": "audio/luck_added.wav", "luck_dropped": "audio/luck_dropped.wav"}
+MUSIC_END = pygame.USEREVENT + 1  # posted by pygame when a streamed track stops
+
+
+class MusicPlayer:
+    def __init__(self, cues=CUES, fade_ms=800, volume=0.3):
+        """
+        Args:
+        -cues: {name: path} of short sounds to load when the mixer starts
+        -fade_ms: Length of each half of a crossfade, in milliseconds
+        -volume: Volume of the background music, from 0 to 1
+        """
+        self.cue_paths = dict(cues)
+        self.cues = {}  # name -> pygame.mixer.Sound, filled in by _ensure_mixer()
+        self.fade_ms = fade_ms
+        self.volume = volume
+        self.current = None  # path of the track streaming now
+        self.pending = None  # (path, loops) to start once the current track has faded out
+
+    def _ensure_mixer(self) -> None:
+        """Opens the audio device and loads the cues, the first time it is called."""
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        if not self.cues:
+            self.cues = {name: pygame.mixer.Sound(path) for name, path in self.cue_paths.items()}
+            pygame.mixer.music.set_endevent(MUSIC_END)
+        return None
+
+    def play(self, path: str, loops=0) -> None:
+        """Streams a track, crossfading from the current one if something is playing."""
+        self._ensure_mixer()
+        if pygame.mixer.music.get_busy():
+            self.pending = (path, loops)
+            pygame.mixer.music.fadeout(self.fade_ms)
+        else:
+            self._start(path, loops)
+        return None
+
+    def _start(self, path: str, loops: int) -> None:
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(loops, fade_ms=self.fade_ms)
+        self.current = path
+        return None
+
+    def stop(self) -> None:
+        """Fades the current track out without starting another."""
+        self.pending = None
+        self.current = None
+        if pygame.mixer.get_init():  # nothing can be playing before the mixer has started
+            pygame.mixer.music.fadeout(self.fade_ms)
+        return None
+
+    def on_music_end(self) -> None:
+        """Starts the track waiting for the crossfade, if any. Call on every MUSIC_END event."""
+        if self.pending:
+            path, loops = self.pending
+            self.pending = None
+            self._start(path, loops)
+        elif not pygame.mixer.music.get_busy():
+            self.current = None
+        return None
+
+    def cue(self, name: str, volume=0.5) -> None:
+        """Plays a preloaded short sound over the music. Without an audio device the cue is skipped."""
+        try:
+            self._ensure_mixer()
+        except pygame.error:
+            return None
+        sound = self.cues[name]
+        sound.set_volume(volume)
+        sound.play()
+        return None
@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiling import percentile  # noqa: E402
+from server import GameServer  # noqa: E402
+
+"""
+Game Server Load Generator
+Plays complete sessions against server.py from many concurrent clients and reports how many sessions per second
+the server completes and the latency of every kind of request.
+
+Each client opens one connection and plays sessions one after another until the total is reached: "new", a
+random choice in every scenario until the route is finished, then "close". The latency of a request is the time
+from writing it to reading its reply, so it includes the time the request waited behind other clients' requests.
+
+Without --connect the server runs in the same process and event loop as the clients, on a free local port, which
+measures the server and the clients together; point --connect at a server started with `python server.py` to
+measure it on its own.
+
+Example:
+python benchmarks/server_load.py --clients 50 --sessions 20000
+python benchmarks/server_load.py --connect 127.0.0.1:8765
+"""
+
+
+async def client(host: str, port: int, sessions: list, rng, latencies: dict, errors: list) -> None:
+    """
+    Plays sessions until the shared counter sessions[0] runs out, recording the latency of every request and
+    counting the sessions played to the end in sessions[1]. A client stops at the first session the server
+    refuses to start, e.g. because it is full.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(op, **fields):
+        started = time.perf_counter()
+        writer.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        reply = json.loads(await reader.readline())
+        latencies[op].append(time.perf_counter() - started)
+        if "error" in reply:
+            errors.append(reply["error"])
+        return reply
+
+    try:
+        while sessions[0] > 0:
+            sessions[0] -= 1
+            reply = await request("new", seed=rng.getrandbits(32))
+            if "error" in reply:
+                break
+            session_id = reply["session"]
+            while "scenario" in reply:
+                reply = await request("choose", session=session_id, choice=rng.choice((1, 2)))
+            if "band" in reply:
+                sessions[1] += 1
+            await request("close", session=session_id)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return None
+
+
+async def run(clients=20, sessions=5000, seed=0, connect=None) -> dict:
+    game_server = None
+    if connect:
+        host, port = connect.rsplit(":", 1)
+        port = int(port)
+    else:
+        game_server = GameServer()
+        server = await game_server.start("127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+
+    rng = random.Random(seed)
+    counters = [sessions, 0]  # left to start and played to the end, shared so sessions go to whichever client is free
+    latencies = {"new": [], "choose": [], "close": []}
+    errors = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(client(host, port, counters, random.Random(rng.getrandbits(32)), latencies, errors) for _ in range(clients))
+    )
+    seconds = time.perf_counter() - started
+
+    report = {
+        "clients": clients,
+        "sessions": counters[1],
+        "seconds": round(seconds, 3),
+        "sessions_per_second": round(counters[1] / seconds, 1),
+        "requests_per_second": round(sum(map(len, latencies.values())) / seconds, 1),
+        "errors": len(errors),
+        "error_kinds": sorted(set(errors)),
+        "latency_ms": {},
+    }
+    for op, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        report["latency_ms"][op] = {f"p{p}": round(percentile(values, p) * 1000, 3) for p in (50, 95, 99)}
+        report["latency_ms"][op]["max"] = round(values[-1] * 1000, 3)
+    if game_server is not None:
+        report["server"] = game_server.stats()
+        server.close()
+        await server.wait_closed()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the multi-session game server.")
+    parser.add_argument("--clients", type=int, default=20, help="concurrent connections")
+    parser.add_argument("--sessions", type=int, default=5000, help="complete sessions to play in total")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connect", help="HOST:PORT of a running server, instead of one in this process")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.clients, args.sessions, args.seed, args.connect)), indent=2))
@@ -0,0 +1,62 @@
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import Session, starting_score  # noqa: E402
+from scenarios import get_game_scenarios, scenario_tree  # noqa: E402
+
+"""
+Session Memory Benchmark
+Holds many game sessions in one process and reports how many bytes each one costs, measured with
+tracemalloc. The scenarios are loaded before measuring because every session shares them.
+
+Two representations are measured:
+- linked_list: what Game keeps for a playthrough, a LinkedList of the route's scenarios plus the score
+- session: the compact engine.Session, a slotted object with the route and luck differences in arrays
+
+Example:
+python benchmarks/session_memory.py --sessions 100000
+"""
+
+
+def linked_list_session(rng):
+    return starting_score(rng), get_game_scenarios(scenario_tree.sample_path(rng))
+
+
+def measure(make_session, sessions: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    held = [make_session(rng) for _ in range(sessions)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    total -= sys.getsizeof(held)  # the list holding the sessions is not part of any session
+    return {"sessions": len(held), "bytes_total": total, "bytes_per_session": round(total / len(held), 1)}
+
+
+def main(sessions=100_000, seed=0) -> dict:
+    for node in scenario_tree.slots:  # load every scenario so only per-session memory is measured
+        if node is not None:
+            node.data
+    return {
+        "linked_list": measure(linked_list_session, sessions, seed),
+        "session": measure(lambda rng: Session(rng=rng), sessions, seed),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory held per game session.")
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.sessions, args.seed), indent=2))
@@ -0,0 +1,236 @@
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # keep stdout machine-readable
+
+import pygame  # noqa: E402
+
+from assets import text_cache  # noqa: E402
+from game import Game  # noqa: E402
+from replay import TraceRecorder  # noqa: E402
+from scenarios import scenario_tree  # noqa: E402
+
+"""
+Event Storm Stress Harness
+Floods a headless Game with synthetic pygame events and reports three things:
+
+- storm: how many events per second handle_events() absorbs when they arrive in batches, as they would after
+  a slow frame. The events are a random mix of mouse moves, clicks on the start, resume, home, continue,
+  play again and choice buttons, SPACE, other keys and QUIT. QUIT is intercepted and counted instead of
+  closing the game.
+- anomalies: every RESUME or CONTINUE click handled while current_state is None, and every exception raised
+  by a handler, with the screen, the input and the last few inputs before it.
+- cycles: memory across thousands of complete days ended with PLAY AGAIN. The buttons, the button pool, the
+  caches, the renderer's display list and the Python heap are sampled at checkpoints, so anything that grows
+  with every day shows up as a rising column.
+
+Clicks are aimed at where a button was last drawn, whatever the current screen is, so a button that is not on
+the screen any more is clicked too; whatever is under that point gets the click, as it would for a player.
+
+Example:
+python benchmarks/stress.py --events 200000 --cycles 2000
+"""
+
+BUTTON_NAMES = ("start", "resume", "quit", "home", "continue", "play_again") + tuple(
+    f"s{layer}_choice{choice}" for layer in range(1, scenario_tree.depth + 1) for choice in (1, 2)
+)
+# relative frequency of each kind of synthetic event
+EVENT_MIX = {"motion": 50, "click": 35, "space": 8, "key": 5, "quit": 2}
+HISTORY = 8  # inputs kept to show what led up to an anomaly
+
+
+class StressGame(Game):
+    """A Game that counts QUIT instead of exiting and records the anomalies the harness looks for."""
+
+    def __init__(self, seed: int):
+        self.quits = 0
+        self.anomalies = []
+        self.history = deque(maxlen=HISTORY)
+        super().__init__(log_to_stdout=False, seeds=[seed], logger=TraceRecorder())
+
+    def quit_game(self, message: str) -> None:
+        self.quits += 1
+        return None
+
+    def dispatch(self, event) -> None:
+        self.history.append((self.current_screen, event))
+        if event in (("click", "resume"), ("click", "continue")) and self.current_state is None:
+            self.record("current_state is None", event)
+        try:
+            super().dispatch(event)
+        except Exception as error:  # the harness keeps going to find every failing state
+            self.record(f"{type(error).__name__}: {error}", event)
+        return None
+
+    def record(self, problem: str, event) -> None:
+        self.anomalies.append(
+            {"problem": problem, "screen": self.current_screen, "input": list(event), "before": list(self.history)[:-1]}
+        )
+        return None
+
+
+def button_positions(game: Game, positions: dict) -> dict:
+    """Updates positions with the screen position of the centre of every button on the current screen."""
+    for name, rect in game.hit_index.rects.items():
+        positions[name] = game.renderer.to_screen(rect.center)
+    return positions
+
+
+def synthetic_events(game: Game, rng, count: int, positions: dict) -> list:
+    """Returns count random events. Clicks go to the last known position of a random button."""
+    width, height = game.screen.get_size()
+    kinds = rng.choices(list(EVENT_MIX), weights=list(EVENT_MIX.values()), k=count)
+    events = []
+    for kind in kinds:
+        if kind == "motion":
+            position = (rng.randrange(width), rng.randrange(height))
+            events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=position, rel=(0, 0), buttons=(0, 0, 0)))
+        elif kind == "click":
+            name = rng.choice(BUTTON_NAMES)
+            position = positions.get(name, (rng.randrange(width), rng.randrange(height)))
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=position, button=1))
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=position, button=1))
+        elif kind == "space":
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        elif kind == "key":
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=rng.choice((pygame.K_a, pygame.K_RETURN, pygame.K_ESCAPE))))
+        else:
+            events.append(pygame.event.Event(pygame.QUIT))
+    return events
+
+
+def storm(events=100_000, batch=64, seed=0) -> dict:
+    """Feeds events to handle_events() in batches and returns the throughput and the anomalies found."""
+    rng = random.Random(seed)
+    game = StressGame(seed)
+    game.show_first_frame()
+    positions = button_positions(game, {})
+
+    handled = 0
+    screens = Counter()
+    busy = 0.0
+    while handled < events:
+        flood = synthetic_events(game, rng, min(batch, events - handled), positions)
+        started = time.perf_counter()
+        game.handle_events(flood + pygame.event.get())  # with what the game posted itself, e.g. ASSET_LOADED
+        game.renderer.present()
+        busy += time.perf_counter() - started
+        handled += len(flood)
+        screens[game.current_screen] += 1
+        button_positions(game, positions)
+    game.assets.close()
+
+    return {
+        "events": handled,
+        "batch": batch,
+        "seconds": round(busy, 3),
+        "events_per_second": round(handled / busy) if busy else None,
+        "us_per_event": round(busy / handled * 1e6, 2) if handled else None,
+        "quits_intercepted": game.quits,
+        "screens_seen": dict(screens),
+        "anomaly_count": len(game.anomalies),
+        "anomaly_kinds": dict(Counter(anomaly["problem"] for anomaly in game.anomalies)),
+        "anomalies": game.anomalies[:10],
+    }
+
+
+def play_day(game: Game) -> None:
+    """Plays one day from the start screen to the end screen and clicks PLAY AGAIN."""
+
+    def click(name):
+        position = game.renderer.to_screen(game.hit_index.rects[name].center)
+        game.handle_events(
+            [
+                pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=position, button=1),
+                pygame.event.Event(pygame.MOUSEBUTTONUP, pos=position, button=1),
+            ]
+        )
+
+    click("start")
+    game.handle_events([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)])
+    while game.current_screen.startswith("scenario"):
+        layer = game.current_screen[len("scenario"):]
+        click(f"s{layer}_choice1")
+        click("continue")
+    click("play_again")
+    game.handle_events()  # what the loader posted, as the main loop would
+    game.renderer.present()
+    return None
+
+
+def sample(game: Game) -> dict:
+    gc.collect()
+    return {
+        "buttons": len(game.buttons),
+        "button_pool": len(game.button_pool),
+        "hit_index": len(game.hit_index.rects),
+        "image_cache_bytes": game.image_cache.current_bytes,
+        "frames": len(game.frames),
+        "frame_buttons": len(game.frame_buttons),
+        "text_cache": len(text_cache),
+        "scaled_cache": len(game.renderer.scaled_cache),
+        "display_list": len(game.renderer.drawn),
+        "log_records": len(game.logger.records),
+        # pixel data lives outside the Python heap, so it is counted from the caches holding it
+        "cached_surface_bytes": sum(
+            cache.current_bytes for cache in (game.image_cache, game.frames, text_cache, game.renderer.scaled_cache)
+        ),
+        "heap_bytes": tracemalloc.get_traced_memory()[0],
+    }
+
+
+def cycles(days=1000, checkpoints=10, seed=0) -> dict:
+    """Plays days complete days in a row and samples memory at evenly spaced checkpoints."""
+    game = StressGame(seed)
+    game.logger.records = deque(maxlen=1000)  # the harness's own log would otherwise be the biggest growth
+    game.show_first_frame()
+    tracemalloc.start()
+    samples = [dict(day=0, **sample(game))]
+    started = time.perf_counter()
+    for day in range(1, days + 1):
+        play_day(game)
+        if day % max(1, days // checkpoints) == 0 or day == days:
+            samples.append(dict(day=day, **sample(game)))
+    seconds = time.perf_counter() - started
+    tracemalloc.stop()
+    game.assets.close()
+
+    first, last = samples[1] if len(samples) > 1 else samples[0], samples[-1]
+    days_between = max(1, last["day"] - first["day"])
+    return {
+        "days": days,
+        "days_per_second": round(days / seconds, 1),
+        "anomaly_count": len(game.anomalies),
+        # measured from the first checkpoint, so the caches filling up on the first days is not counted
+        "heap_bytes_per_day": round((last["heap_bytes"] - first["heap_bytes"]) / days_between, 1),
+        "cached_surface_bytes_per_day": round(
+            (last["cached_surface_bytes"] - first["cached_surface_bytes"]) / days_between, 1
+        ),
+        "samples": samples,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flood a headless game with synthetic events.")
+    parser.add_argument("--events", type=int, default=100_000, help="events in the storm")
+    parser.add_argument("--batch", type=int, default=64, help="events handled per handle_events() call")
+    parser.add_argument("--cycles", type=int, default=1000, help="complete days played for the memory check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = {
+        "storm": storm(args.events, args.batch, args.seed),
+        "cycles": cycles(args.cycles, seed=args.seed),
+    }
+    print(json.dumps(report, indent=2))
+    pygame.quit()
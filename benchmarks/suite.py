@@ -0,0 +1,269 @@
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # headless, so the numbers do not depend on a window
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # keep stdout machine-readable
+
+import pygame  # noqa: E402
+
+from game import Game  # noqa: E402
+from replay import TraceRecorder  # noqa: E402
+from scenarios import ArrayTree, TreeNode, get_game_scenarios, get_path  # noqa: E402
+
+"""
+Benchmark Suite
+Times the game's hot paths headless, with the SDL dummy drivers:
+- game_init: Game.__init__
+- display_start_screen, display_scenario, display_outcome, display_end_screen: drawing a screen and presenting
+  it. display_scenario_cold also composites the scenario frame, the others use frames already in the cache.
+- handle_events_*: per event, for floods of mouse moves over the buttons, of key presses nothing is bound to,
+  and of clicks going back and forth between a scenario and the start screen
+- get_path_*, sample_path_*, get_game_scenarios_*: one route through complete trees of several depths
+
+Every benchmark reports the median and the fastest time of one call in microseconds, as JSON. With --compare
+the fastest times are checked against a stored baseline and the suite exits with 1 if any of them is slower by
+more than the tolerance: the fastest sample is the one least disturbed by the rest of the machine, so it moves
+far less from run to run than the median. Benchmarks that take a few microseconds average many calls per
+sample, so a sample is well above the timer's resolution. Baselines are specific to the machine they were
+recorded on; record a new one with --save-baseline after changing machines or when a change is meant to make
+something slower.
+
+Example:
+python benchmarks/suite.py --compare
+python benchmarks/suite.py --save-baseline
+python benchmarks/suite.py --quick --only display_
+"""
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TOLERANCE = 0.25  # a fastest time more than 25% over its baseline is a regression
+PATH_CALLS = 2000  # calls per sample for the route benchmarks, which take a few microseconds each
+TREE_DEPTHS = (4, 10, 16)
+FLOOD_SIZE = 2000
+
+
+def timed(function, repeat: int, number=1, setup=None) -> dict:
+    """
+    Time a function
+
+    Args:
+    -function: The function to time, called with no arguments
+    -repeat: The number of samples taken
+    -number: The number of calls per sample; a sample is their average
+    -setup: Called with no arguments before every sample, outside the timing
+
+    Returns:
+    -result: The median and the fastest sample in microseconds
+    """
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # like timeit, so a collection triggered by earlier garbage is not charged to the sample
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            for _ in range(number):
+                function()
+            samples.append((time.perf_counter() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "min_us": round(min(samples) * 1e6, 2),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def selected(name: str, only) -> bool:
+    """Returns True if the benchmark called name is to run, i.e. only is empty or name starts with one of it."""
+    return not only or any(name.startswith(prefix) for prefix in only)
+
+
+def new_game() -> Game:
+    """Returns a seeded game on its start screen that logs to memory."""
+    game = Game(log_to_stdout=False, seeds=[0], logger=TraceRecorder())
+    game.show_first_frame()
+    return game
+
+
+def click_events(game: Game, name: str) -> list:
+    """Returns the mouse events of a click on the button called name on the current screen."""
+    position = game.renderer.to_screen(game.hit_index.rects[name].center)
+    return [
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=position, button=1),
+        pygame.event.Event(pygame.MOUSEBUTTONUP, pos=position, button=1),
+    ]
+
+
+SCREENS = ("display_start_screen", "display_scenario", "display_scenario_cold", "display_outcome", "display_end_screen")
+
+
+def bench_screens(repeat: int, only=None) -> dict:
+    results = {}
+
+    def init():
+        game = Game(log_to_stdout=False, seeds=[0], logger=TraceRecorder())
+        game.assets.close()
+
+    if selected("game_init", only):
+        results["game_init"] = timed(init, max(3, repeat // 10))
+    if not any(selected(name, only) for name in SCREENS):
+        return results
+
+    game = new_game()
+    game.on_day_started()
+    scenario = game.current_state.value
+
+    def show(draw):
+        def run():
+            draw()
+            game.renderer.present()
+
+        return run
+
+    benches = {
+        "display_start_screen": dict(function=show(game.display_start_screen)),
+        "display_scenario": dict(function=show(lambda: game.display_scenario(scenario))),
+        "display_scenario_cold": dict(function=show(lambda: game.display_scenario(scenario)), setup=game.frames.clear),
+        "display_outcome": dict(function=show(lambda: game.display_outcome(1))),
+        "display_end_screen": dict(function=show(game.display_end_screen)),
+    }
+    for name, bench in benches.items():
+        if selected(name, only):
+            results[name] = timed(repeat=repeat, **bench)
+    game.assets.close()
+    return results
+
+
+def bench_events(repeat: int, only=None, flood_size=FLOOD_SIZE) -> dict:
+    results = {}
+    if not any(selected(f"handle_events_{name}", only) for name in ("motion", "keys", "clicks")):
+        return results
+    rng = random.Random(0)
+    game = new_game()
+    game.on_day_started()
+    scenario = game.current_state.value
+    width, height = game.screen.get_size()
+
+    motion = [
+        pygame.event.Event(pygame.MOUSEMOTION, pos=(rng.randrange(width), rng.randrange(height)), rel=(0, 0), buttons=(0, 0, 0))
+        for _ in range(flood_size)
+    ]
+    keys = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a) for _ in range(flood_size)]
+
+    # home on the scenario screen, then resume on the start screen, and round again
+    home = click_events(game, "home")
+    game.handle_events(home)
+    resume = click_events(game, "resume")
+    game.handle_events(resume)
+    clicks = (home + resume) * (flood_size // 4)
+
+    def flood(events):
+        def run():
+            game.handle_events(events)
+            game.renderer.present()
+
+        return run
+
+    sample_repeat = max(3, repeat // 10)
+    for name, events in (("motion", motion), ("keys", keys), ("clicks", clicks)):
+        if not selected(f"handle_events_{name}", only):
+            continue
+        game.display_scenario(scenario)
+        result = timed(flood(events), sample_repeat)
+        # per event, so floods of different sizes compare
+        result["median_us"] = round(result["median_us"] / len(events), 3)
+        result["min_us"] = round(result["min_us"] / len(events), 3)
+        result["events"] = len(events)
+        results[f"handle_events_{name}"] = result
+    game.assets.close()
+    return results
+
+
+def complete_tree(depth: int):
+    """Returns the root of a complete binary tree of TreeNodes with depth layers, holding their heap index."""
+    nodes = [TreeNode(i) for i in range(2**depth - 1)]
+    for i, node in enumerate(nodes):
+        if 2 * i + 2 < len(nodes):
+            node.left, node.right = nodes[2 * i + 1], nodes[2 * i + 2]
+    return nodes[0]
+
+
+def bench_paths(repeat: int, only=None, depths=TREE_DEPTHS) -> dict:
+    results = {}
+    for depth in depths:
+        names = [f"{bench}_depth{depth}" for bench in ("get_path", "sample_path", "get_game_scenarios")]
+        if not any(selected(name, only) for name in names):
+            continue  # the deepest tree alone takes a while to build
+        root = complete_tree(depth)
+        tree = ArrayTree.from_root(root)
+        rng = random.Random(0)
+        path = get_path(root, rng)
+        functions = (lambda: get_path(root, rng), lambda: tree.sample_path(rng), lambda: get_game_scenarios(path))
+        for name, function in zip(names, functions):
+            if selected(name, only):
+                results[name] = timed(function, repeat, number=PATH_CALLS)
+    return results
+
+
+def run(repeat=50, only=None) -> dict:
+    """Runs the benchmarks whose names start with one of only, or all of them, and returns their results."""
+    results = {}
+    for bench in (bench_screens, bench_events, bench_paths):
+        results.update(bench(repeat, only))
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance=TOLERANCE) -> dict:
+    """Returns, for every benchmark in both, its baseline and current fastest times, their ratio and if it regressed."""
+    comparison = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["min_us"], result["min_us"]
+        ratio = after / before if before else float("inf")
+        comparison[name] = {
+            "baseline_us": before,
+            "current_us": after,
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + tolerance,
+        }
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the game's hot paths headless.")
+    parser.add_argument("--repeat", type=int, default=50, help="samples per benchmark")
+    parser.add_argument("--quick", action="store_true", help="fewer samples, for a rough number")
+    parser.add_argument("--only", nargs="*", help="run only benchmarks whose name starts with one of these")
+    parser.add_argument("--compare", action="store_true", help="compare with the stored baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    results = run(10 if args.quick else args.repeat, args.only)
+    report = {"results": results}
+    regressed = False
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            report["comparison"] = compare(results, json.load(baseline_file)["results"], args.tolerance)
+        regressed = any(entry["regressed"] for entry in report["comparison"].values())
+        report["regressed"] = sorted(name for name, entry in report["comparison"].items() if entry["regressed"])
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"results": results}, baseline_file, indent=2)
+
+    print(json.dumps(report, indent=2))
+    pygame.quit()
+    raise SystemExit(1 if regressed else 0)
@@ -0,0 +1,95 @@
+import argparse
+import glob
+import json
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # packing needs no window
+import pygame  # noqa: E402
+
+from assets import ATLAS_DIR, ATLAS_MANIFEST, atlas_name  # noqa: E402
+
+"""
+Texture Atlas Build Step
+Packs every PNG in graphics/ into one or a few large atlas images plus a JSON manifest giving the sheet and
+rectangle of each picture. The game then opens and decodes the sheets once instead of one file per picture
+(see assets.Atlas). Run it again whenever a picture in graphics/ changes; without an atlas the game simply
+loads the individual files.
+
+Pictures are packed on shelves: sorted from tallest to shortest, placed left to right, and a new shelf is
+started when a row is full. A new sheet is started when a sheet is full.
+
+Example:
+python build_atlas.py
+python build_atlas.py --max-size 1024 --padding 2
+"""
+
+
+def pack(sizes: dict, max_size: int, padding: int) -> list:
+    """
+    Place rectangles on shelves
+
+    Args:
+    -sizes: {name: (width, height)}
+    -max_size: The largest width and height of a sheet
+    -padding: Empty pixels kept around every picture
+
+    Returns:
+    -sheets: A list of {name: (x, y, width, height)}, one dictionary per sheet
+    """
+    sheets = [{}]
+    x = y = shelf_height = 0
+    for name, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        # a picture is placed padding past the cursor and needs padding after it too, so it fits if
+        # cursor + padding + size + padding <= max_size
+        if width + 2 * padding > max_size or height + 2 * padding > max_size:
+            raise ValueError(f"{name} is {width}x{height}, larger than a {max_size}x{max_size} sheet")
+        if x + padding + width + padding > max_size:  # row full, start a new shelf
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + padding + height + padding > max_size:  # sheet full, start a new sheet
+            sheets.append({})
+            x = y = shelf_height = 0
+        sheets[-1][name] = (x + padding, y + padding, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+    return sheets
+
+
+def build(source_dir="graphics", output_dir=ATLAS_DIR, max_size=2048, padding=2) -> dict:
+    """Packs the pictures in source_dir and writes the sheets and the manifest to output_dir."""
+    pictures = {
+        atlas_name(path): pygame.image.load(path)
+        for path in sorted(glob.glob(os.path.join(source_dir, "*.png")))
+    }
+    sheets = pack({name: picture.get_size() for name, picture in pictures.items()}, max_size, padding)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {"sheets": [], "images": {}}
+    for number, placements in enumerate(sheets):
+        width = max(x + w for x, y, w, h in placements.values()) + padding
+        height = max(y + h for x, y, w, h in placements.values()) + padding
+        sheet = pygame.Surface((width, height))
+        for name, (x, y, w, h) in placements.items():
+            sheet.blit(pictures[name], (x, y))
+            manifest["images"][name] = {"sheet": number, "rect": [x, y, w, h]}
+
+        file_name = f"atlas{number}.png"
+        pygame.image.save(sheet, os.path.join(output_dir, file_name))
+        manifest["sheets"].append({"file": file_name, "size": [width, height]})
+
+    with open(os.path.join(output_dir, os.path.basename(ATLAS_MANIFEST)), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack graphics/*.png into texture atlas sheets.")
+    parser.add_argument("--source", default="graphics")
+    parser.add_argument("--output", default=ATLAS_DIR)
+    parser.add_argument("--max-size", type=int, default=2048)
+    parser.add_argument("--padding", type=int, default=2)
+    args = parser.parse_args()
+
+    result = build(args.source, args.output, args.max_size, args.padding)
+    for sheet in result["sheets"]:
+        print(f"{sheet['file']}: {sheet['size'][0]}x{sheet['size'][1]}")
+    print(f"{len(result['images'])} pictures packed into {len(result['sheets'])} sheet(s)")
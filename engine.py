@@ -0,0 +1,504 @@
+import argparse
+import json
+import random
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+
+from scenarios import Node1, get_path, scenario_tree
+
+np = None  # numpy, imported by _numpy() the first time a vectorised function runs
+
+"""
+This is the Game Engine Module
+It holds the rules of Luckometer without any rendering, so the same rules drive both the pygame Game class
+and headless simulations:
+
+- a player starts with a luck score drawn uniformly from START_SCORE_RANGE
+- a day is one get_path() route through the scenario tree
+- every scenario's luck_diff is drawn uniformly from its luck_range when a session starts, and the simulations
+  below draw them the same way for every game they play
+- in every scenario the player picks a choice, and the outcome of that choice is positive or negative with
+  equal chance, adding or subtracting the scenario's luck_diff
+- the final score falls into one of three bands, using the thresholds shown on the end screen
+
+simulate() plays N complete days in batch with a seeded random number generator and can spread the games
+over a process pool so that runs of millions of games use every core.
+
+Example:
+result = simulate(1_000_000, seed=42, workers=8)
+print(result["bands"])  # {'lucky': ..., 'neutral': ..., 'unlucky': ...}
+
+simulate_vectorised() gives the same distribution with NumPy. Instead of one Python game at a time it keeps
+every player's position in the tree and score in arrays and advances all of them one layer per step, which
+is what makes tuning LUCKY_THRESHOLD and UNLUCKY_THRESHOLD over tens of millions of games practical.
+
+ExactDistribution does not sample at all. Every outcome is +luck_diff or -luck_diff with probability 1/2, with
+luck_diff uniform over the scenario's luck_range, and every branch is taken with probability 1/2, so the
+distribution of the final score is the starting score convolved with the outcomes along the tree. It is
+computed once and then updated along a single root path when one scenario's luck_diff is pinned to a value,
+so balancing tools can call it in a tight loop.
+
+Example:
+exact = ExactDistribution()
+print(exact.band_probabilities())  # {'lucky': ..., 'neutral': ..., 'unlucky': ...}
+exact.set_luck_diff(root.left.left, 15)  # as if that scenario always had a luck_diff of 15
+print(exact.pmf()[20])  # the probability of finishing on exactly 20
+
+From the command line:
+python engine.py 1000000 --seed 42 --workers 8
+python engine.py 10000000 --seed 42 --vectorised
+"""
+
+START_SCORE_RANGE = (5, 20)
+LUCKY_THRESHOLD = 50  # a final score above this is a lucky day
+UNLUCKY_THRESHOLD = 20  # a final score below this is an unlucky day
+
+LUCKY = "lucky"
+NEUTRAL = "neutral"
+UNLUCKY = "unlucky"
+BANDS = (LUCKY, NEUTRAL, UNLUCKY)
+
+# message shown under the final score at the end of a day, for each outcome band
+END_MESSAGES = {
+    LUCKY: "It's your lucky day!",
+    NEUTRAL: "It's just like any other day.",
+    UNLUCKY: "Uh oh, a black cat may be around the corner!",
+}
+
+
+def starting_score(rng=random) -> int:
+    """Returns a random initial luck score."""
+    return rng.randint(*START_SCORE_RANGE)
+
+
+def resolve_outcome(scenario, choice_num: int, rng=random, luck_diff=None):
+    """
+    Decide the outcome of a choice in a scenario
+
+    Args:
+    -scenario: The Scenario being played
+    -choice_num: 1 or 2, the choice the player made
+    -rng: The random number generator to use, defaults to the random module
+    -luck_diff: The luck at stake, defaults to scenario.luck_diff
+
+    Returns:
+    -outcome_key: The key of the outcome text in scenario.cases, e.g. "neg_outcome2"
+    -luck_change: The amount to add to the luck score, +luck_diff or -luck_diff
+    """
+    if luck_diff is None:
+        luck_diff = scenario.luck_diff
+    if rng.choice([True, False]):
+        return f"pos_outcome{choice_num}", luck_diff
+    return f"neg_outcome{choice_num}", -luck_diff
+
+
+def score_band(score: int) -> str:
+    """Returns LUCKY, NEUTRAL or UNLUCKY for a final luck score."""
+    if score > LUCKY_THRESHOLD:
+        return LUCKY
+    if score < UNLUCKY_THRESHOLD:
+        return UNLUCKY
+    return NEUTRAL
+
+
+class Session:
+    """
+    The state of one playthrough without anything to do with pygame: the luck score, the route through the
+    scenario tree as slot numbers of an ArrayTree, the luck differences drawn for this session, and how far
+    along the route the player is. Scenarios themselves are shared by every session.
+
+    __slots__ and two small arrays keep a session to a few hundred bytes, so a process can hold a very large
+    number of them (see benchmarks/session_memory.py).
+    """
+
+    __slots__ = ("tree", "luck_score", "route", "luck_diffs", "position")
+
+    def __init__(self, tree=scenario_tree, rng=random):
+        self.tree = tree
+        self.luck_score = starting_score(rng)
+        # slot numbers go up to the number of scenarios in the tree, past what short integers hold in big catalogs
+        route = array("h" if len(tree.slots) <= 0x7FFF else "l", [-1]) * tree.depth
+        self.route = route[: tree.sample_path_slots(rng, route)]
+        self.luck_diffs = array("h", [rng.randint(*self.scenario_at(i).luck_range) for i in range(len(self.route))])
+        self.position = 0
+
+    def __len__(self):
+        return len(self.route)
+
+    def __iter__(self):
+        """Iterates over the scenarios on this session's route."""
+        return (self.scenario_at(i) for i in range(len(self.route)))
+
+    def scenario_at(self, position: int):
+        return self.tree.slots[self.route[position]].data
+
+    @property
+    def scenario(self):
+        """The scenario the player is on, None once the route is finished."""
+        return self.scenario_at(self.position) if not self.finished else None
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.route)
+
+    def choose(self, choice_num: int, rng=random):
+        """
+        Play a choice in the current scenario and move on to the next one
+
+        Returns:
+        -outcome_text: The text of the outcome, ending with the luck it changed
+        -luck_change: The amount added to the luck score
+        """
+        scenario, luck_diff = self.scenario, self.luck_diffs[self.position]
+        outcome_key, luck_change = resolve_outcome(scenario, choice_num, rng, luck_diff)
+        self.luck_score += luck_change
+        self.position += 1
+        return scenario.outcome_text(outcome_key, luck_diff), luck_change
+
+
+def play_game(root=Node1, rng=random) -> int:
+    """
+    Play one complete day with random choices, the way a player clicking at random would
+
+    Returns:
+    -score: The final luck score
+    """
+    score = starting_score(rng)
+    for scenario in get_path(root, rng):
+        luck_diff = rng.randint(*scenario.luck_range)  # drawn for every game, as a session does
+        choice_num = rng.choice([1, 2])
+        score += resolve_outcome(scenario, choice_num, rng, luck_diff)[1]
+    return score
+
+
+def _simulate_chunk(root, games: int, seed) -> Counter:
+    """Plays a batch of games in one process and returns how often each final score occurred."""
+    rng = random.Random(seed)
+    return Counter(play_game(root, rng) for _ in range(games))
+
+
+def simulate(games: int, seed=None, workers=1, root=Node1) -> dict:
+    """
+    Play many complete games headlessly
+
+    Args:
+    -games: The number of games to play
+    -seed: Seed for the random number generators, None for a random seed. Routes, luck_diffs, choices and
+           outcomes are all drawn from it, so the same seed and number of workers always gives the same result.
+    -workers: The number of processes to use, None for one per CPU core. 1 plays in this process.
+    -root: The root of the scenario tree
+
+    Returns:
+    -result: A dictionary with the number of games, the score distribution {score: count}, the count of games
+             in each band, and the mean score
+    """
+    if workers is None:
+        workers = cpu_count() or 1
+    workers = max(1, min(workers, games))
+
+    # every chunk gets its own seed drawn from the master seed, so the chunks are independent but reproducible
+    master = random.Random(seed)
+    sizes = [games // workers + (1 if i < games % workers else 0) for i in range(workers)]
+    seeds = [master.getrandbits(64) for _ in sizes]
+
+    if workers == 1:
+        scores = _simulate_chunk(root, sizes[0], seeds[0])
+    else:
+        scores = Counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_simulate_chunk, [root] * workers, sizes, seeds):
+                scores.update(chunk)
+
+    return summarise(scores)
+
+
+def summarise(scores: Counter) -> dict:
+    """Turns a {score: count} counter into the result dictionary returned by simulate()."""
+    games = sum(scores.values())
+    bands = {band: 0 for band in BANDS}
+    for score, count in scores.items():
+        bands[score_band(score)] += count
+
+    return {
+        "games": games,
+        "scores": dict(sorted(scores.items())),
+        "bands": bands,
+        "mean": sum(score * count for score, count in scores.items()) / games if games else 0.0,
+    }
+
+
+def flatten_tree(root=Node1):
+    """
+    Number the nodes of the scenario tree breadth first and store it as parallel lists
+
+    Returns:
+    -luck_ranges: luck_ranges[i] is the (low, high) luck_range of node i, the root is node 0
+    -children: children[i] is the (left, right) pair of node numbers of node i, -1 where there is no child
+    """
+    nodes = [root]
+    numbers = {id(root): 0}
+    for node in nodes:  # the list grows while it is walked, which makes this a breadth first search
+        for child in (node.left, node.right):
+            if child is not None and id(child) not in numbers:
+                numbers[id(child)] = len(nodes)
+                nodes.append(child)
+
+    luck_ranges = [tuple(node.data.luck_range) for node in nodes]
+    children = [
+        tuple(numbers[id(child)] if child is not None else -1 for child in (node.left, node.right))
+        for node in nodes
+    ]
+    return luck_ranges, children
+
+
+def _numpy():
+    """
+    Import numpy on first use. It is optional and only the vectorised functions need it, so importing the
+    engine, as the game does at startup, does not pay for it.
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("simulate_vectorised() needs numpy, install it with 'pip install numpy'") from None
+        np = numpy
+    return np
+
+
+def sample_scores(games: int, seed=None, root=Node1):
+    """
+    Play many games at once with NumPy and return every final score
+
+    The choice a player makes never changes the luck at stake, only the outcome text, so the choices are not
+    sampled. Each step draws one luck_diff, one positive or negative outcome and one branch per player.
+
+    Args:
+    -games: The number of games to play
+    -seed: Seed for numpy.random.default_rng, None for a random seed
+    -root: The root of the scenario tree
+
+    Returns:
+    -scores: An int64 array with the final luck score of every game
+    """
+    np = _numpy()
+
+    luck_ranges, children = flatten_tree(root)
+    luck_ranges = np.array(luck_ranges, dtype=np.int64).reshape(-1, 2)
+    children = np.array(children, dtype=np.int64).reshape(-1, 2)
+    rng = np.random.default_rng(seed)
+
+    low, high = START_SCORE_RANGE
+    scores = rng.integers(low, high + 1, size=games)
+    nodes = np.zeros(games, dtype=np.int64)
+    playing = np.ones(games, dtype=bool)
+
+    while playing.any():
+        luck_diffs = rng.integers(luck_ranges[nodes, 0], luck_ranges[nodes, 1] + 1)
+        outcome_signs = rng.integers(0, 2, size=games) * 2 - 1  # +1 or -1 with equal chance
+        scores += np.where(playing, outcome_signs * luck_diffs, 0)
+
+        branches = rng.integers(0, 2, size=games)
+        next_nodes = children[nodes, branches]
+        playing &= next_nodes != -1
+        nodes = np.where(playing, next_nodes, nodes)
+
+    return scores
+
+
+def band_counts(scores, lucky_threshold=LUCKY_THRESHOLD, unlucky_threshold=UNLUCKY_THRESHOLD) -> dict:
+    """Counts the scores in each band for a pair of thresholds, so different thresholds can be compared."""
+    np = _numpy()
+    lucky = int(np.count_nonzero(scores > lucky_threshold))
+    unlucky = int(np.count_nonzero(scores < unlucky_threshold))
+    return {LUCKY: lucky, NEUTRAL: len(scores) - lucky - unlucky, UNLUCKY: unlucky}
+
+
+def simulate_vectorised(games: int, seed=None, root=Node1, chunk_size=1_000_000) -> dict:
+    """
+    Same as simulate(), but plays the games as NumPy arrays in chunks of chunk_size to bound memory use.
+    The random streams differ from simulate(), so the same seed gives a different sample of the same distribution.
+    """
+    np = _numpy()
+
+    scores = Counter()
+    seeds = np.random.SeedSequence(seed).spawn(-(-games // chunk_size)) if games else []
+    for i, chunk_seed in enumerate(seeds):
+        chunk = sample_scores(min(chunk_size, games - i * chunk_size), chunk_seed, root)
+        values, counts = np.unique(chunk, return_counts=True)
+        scores.update(dict(zip(values.tolist(), counts.tolist())))
+    return summarise(scores)
+
+
+# A distribution of luck changes is stored as (low, probabilities) where probabilities[i] is the chance of a
+# change of low + i.
+NO_CHANGE = (0, [1.0])
+
+
+def _add_outcome(distribution, luck_diffs):
+    """
+    Convolves a distribution with an outcome of +luck_diff or -luck_diff, each with probability 1/2, where
+    luck_diff is any of luck_diffs with equal chance
+    """
+    luck_diffs = [abs(luck_diff) for luck_diff in luck_diffs]
+    widest = max(luck_diffs)
+    if widest == 0:
+        return distribution
+    # the distribution of the luck change of this one outcome, as offsets from -widest
+    kernel = [0.0] * (2 * widest + 1)
+    for luck_diff in luck_diffs:
+        kernel[widest - luck_diff] += 0.5 / len(luck_diffs)
+        kernel[widest + luck_diff] += 0.5 / len(luck_diffs)
+    # luck_diffs is a range, so the kernel is a few runs of equal chance (two when the range does not cross 0),
+    # and each run is a box filter: a difference of two prefix sums per output, O(n) instead of O(n * widest)
+    runs = []
+    for offset, chance in enumerate(kernel):
+        if runs and runs[-1][1] == offset - 1 and runs[-1][2] == chance:
+            runs[-1][1] = offset
+        elif chance:
+            runs.append([offset, offset, chance])
+
+    low, probabilities = distribution
+    size = len(probabilities)
+    # prefix sums padded with 2 * widest zeros before and copies of the total after, so no index needs clamping
+    pad = 2 * widest
+    prefix = [0.0] * (pad + 1)
+    for probability in probabilities:
+        prefix.append(prefix[-1] + probability)
+    prefix.extend([prefix[-1]] * pad)
+    combined = [0.0] * (size + 2 * widest)
+    for first, last, chance in runs:
+        # output k gets the probabilities at k - last .. k - first, for k from first to size + last - 1
+        uppers = prefix[pad + 1 : pad + size + last - first + 1]
+        lowers = prefix[pad + first - last : pad + size]
+        totals = combined[first : size + last]
+        combined[first : size + last] = [
+            total + chance * (upper - lower) for total, upper, lower in zip(totals, uppers, lowers)
+        ]
+    return low - widest, combined
+
+
+def _mix(first, second):
+    """Returns the distribution of picking first or second with probability 1/2 each."""
+    low = min(first[0], second[0])
+    high = max(first[0] + len(first[1]), second[0] + len(second[1]))
+    mixed = [0.0] * (high - low)
+    for start, probabilities in (first, second):
+        offset = start - low
+        for i, probability in enumerate(probabilities):
+            mixed[offset + i] += probability / 2
+    return low, mixed
+
+
+class ExactDistribution:
+    def __init__(self, root=Node1):
+        """
+        Compute the exact distribution of the final luck score for a scenario tree
+
+        Args:
+        -root: The root of the scenario tree. Every scenario's luck_diff is uniform over its luck_range, as in
+               a session; set_luck_diff() pins one of them without changing the game itself.
+        """
+        self.root = root
+        self._parents = {}  # id(node) -> parent node, None for the root
+        self._nodes = {}  # id(node) and id(scenario) -> node
+        self._luck_diffs = {}  # id(node) -> the luck_diffs the node draws from, each equally likely
+        self._changes = {}  # id(node) -> distribution of the luck change from this node to the end of the day
+        self._final = None  # cached (low, probabilities) of the final score
+
+        stack = [(root, None)]
+        order = []
+        while stack:
+            node, parent = stack.pop()
+            if node is None or id(node) in self._parents:
+                continue
+            self._parents[id(node)] = parent
+            self._nodes[id(node)] = self._nodes[id(node.data)] = node
+            low, high = node.data.luck_range
+            self._luck_diffs[id(node)] = range(low, high + 1)
+            order.append(node)
+            stack.extend(((node.left, node), (node.right, node)))
+
+        for node in reversed(order):  # children are always computed before their parents
+            self._update_node(node)
+
+    def _update_node(self, node) -> None:
+        branches = [
+            self._changes[id(child)] if child is not None else NO_CHANGE for child in (node.left, node.right)
+        ]
+        self._changes[id(node)] = _add_outcome(_mix(*branches), self._luck_diffs[id(node)])
+        return None
+
+    def set_luck_diff(self, node_or_scenario, luck_diff: int) -> None:
+        """
+        Pin the luck_diff of one scenario to a single value and update the distribution. Only the nodes between
+        that scenario and the root are recomputed.
+
+        Args:
+        -node_or_scenario: The TreeNode or the Scenario to change
+        -luck_diff: The luck_diff it always has from now on
+        """
+        node = self._nodes[id(node_or_scenario)]
+        self._luck_diffs[id(node)] = (luck_diff,)
+        while node is not None:
+            self._update_node(node)
+            node = self._parents[id(node)]
+        self._final = None
+        return None
+
+    def _final_distribution(self):
+        if self._final is None:
+            # adding a starting score uniform on [start_low, start_high] is a moving average over a window of
+            # that width, computed with prefix sums
+            start_low, start_high = START_SCORE_RANGE
+            width = start_high - start_low + 1
+            low, probabilities = self._changes[id(self.root)]
+            prefix = [0.0]
+            for probability in probabilities:
+                prefix.append(prefix[-1] + probability)
+            final = [
+                (prefix[min(k + 1, len(probabilities))] - prefix[max(k - width + 1, 0)]) / width
+                for k in range(len(probabilities) + width - 1)
+            ]
+            self._final = (low + start_low, final)
+        return self._final
+
+    def pmf(self) -> dict:
+        """Returns {final score: probability} for every score that can happen."""
+        low, probabilities = self._final_distribution()
+        return {low + i: probability for i, probability in enumerate(probabilities) if probability}
+
+    def band_probabilities(self, lucky_threshold=LUCKY_THRESHOLD, unlucky_threshold=UNLUCKY_THRESHOLD) -> dict:
+        """Returns the probability of each band for a pair of thresholds."""
+        low, probabilities = self._final_distribution()
+        bands = {band: 0.0 for band in BANDS}
+        for i, probability in enumerate(probabilities):
+            score = low + i
+            if score > lucky_threshold:
+                bands[LUCKY] += probability
+            elif score < unlucky_threshold:
+                bands[UNLUCKY] += probability
+            else:
+                bands[NEUTRAL] += probability
+        return bands
+
+    def mean(self) -> float:
+        low, probabilities = self._final_distribution()
+        return sum((low + i) * probability for i, probability in enumerate(probabilities))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Luckometer headlessly and print the score distribution.")
+    parser.add_argument("games", type=int, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use, defaults to one per core")
+    parser.add_argument("--vectorised", action="store_true", help="play the games with numpy in this process")
+    args = parser.parse_args()
+
+    if args.vectorised:
+        result = simulate_vectorised(args.games, args.seed)
+    else:
+        result = simulate(args.games, args.seed, args.workers)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,151 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+"""
+This is the Event Logging Module
+Game.log_event() used to write to the log file and print to the terminal on the game's own thread, and
+truncated the log every time the game started.
+
+The EventLogger class moves that work to a background thread. log() only puts a record on a bounded queue,
+and the writer thread takes records off in batches, appends them to the log file as JSON Lines (one JSON
+object per line) and flushes once per batch. When the log file grows past max_bytes it is rotated to
+luckometer.log.1, luckometer.log.2 and so on, so logs from many sessions are kept without growing forever.
+If the queue is full because the disk cannot keep up, records are dropped and counted rather than stalling
+the game.
+
+Every record has the wall-clock time, the seconds since the game started, a session id shared by all
+records of one run of the game, the screen being shown, the type of event and the event itself:
+{"time": 1718700000.123, "elapsed": 3.333, "session": "3f2a9c1d0b7e", "screen": "start",
+ "type": "click", "event": "START BUTTON CLICKED"}
+
+Example:
+logger = EventLogger("luckometer.log", echo=False)
+logger.log("START SCREEN DISPLAYED", elapsed=1.395, screen="start", event_type="screen")
+logger.close()  # writes whatever is still queued
+"""
+
+_STOP = object()  # put on the queue by close() to stop the writer thread
+
+
+class EventLogger:
+    def __init__(
+        self,
+        path: str,
+        session_id=None,
+        echo=True,
+        max_bytes=1024 * 1024,
+        backups=5,
+        queue_size=10000,
+        batch_size=256,
+        flush_interval=0.25,
+    ):
+        """
+        Open the log file for appending and start the writer thread
+
+        Args:
+        -path: The log file
+        -session_id: The id written on every record, defaults to a new random id
+        -echo: Also print every event to stdout, from the writer thread. False is the no-stdout mode.
+        -max_bytes: Size at which the log file is rotated
+        -backups: The number of rotated files kept
+        -queue_size: The most records waiting to be written before new ones are dropped
+        -batch_size: The most records written per flush
+        -flush_interval: The longest a record waits on the queue before it is written, in seconds
+        """
+        self.path = path
+        self.session_id = session_id or uuid.uuid4().hex[:12]
+        self.echo = echo
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = open(path, "a", encoding="utf-8")
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._write_loop, name="EventLogger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)  # exit() from inside the game still gets the queued records written
+
+    def log(self, event: str, elapsed: float, screen="", event_type="info") -> None:
+        """Queue one event. Never blocks; the record is dropped if the queue is full."""
+        if self._closed:
+            return None
+        record = {
+            "time": round(time.time(), 3),
+            "elapsed": elapsed,
+            "session": self.session_id,
+            "screen": screen,
+            "type": event_type,
+            "event": event,
+        }
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        return None
+
+    def _write_loop(self) -> None:
+        while True:
+            record = self._queue.get()
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            # collect more records until the batch is full or the oldest one has waited flush_interval
+            while record is not _STOP and len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(record)
+
+            stopping = batch[-1] is _STOP
+            records = [record for record in batch if record is not _STOP]
+            if records:
+                self._write(records)
+            if stopping:
+                return None
+
+    def _write(self, records) -> None:
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._file.flush()
+        self.written += len(records)
+        if self.echo:
+            for record in records:
+                print(f"{record['elapsed']}s: {record['event']}")
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+        return None
+
+    def _rotate(self) -> None:
+        """Renames luckometer.log to luckometer.log.1, .1 to .2 and so on, and starts a new file."""
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        return None
+
+    def close(self) -> None:
+        """Writes every queued record, stops the writer thread and closes the file. Safe to call twice."""
+        if self._closed:
+            return None
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+        atexit.unregister(self.close)
+        return None
@@ -1,947 +1,993 @@
-import pygame
-import random
-import os
-from random import randint, choice
-from sys import exit
-
-"""
-    Below is a clickable button class for Pygame.
-
-    Parameters:
-    text (str): The text to display on the button.
-    text_color (tuple): The color of the text.
-    bg_color (tuple): The background color of the button.
-    font (str, optional): The font to use. Defaults to "monospace".
-    size (int, optional): The font size. Defaults to 15.
-
-    Attributes:
-    width (int): The width of the button.
-    height (int): The height of the button.
-    image (pygame.Surface): The button's image.
-    rect (pygame.Rect): The button's rectangle.
-    text_rect (pygame.Rect): The text's rectangle.
-    clicked (bool): Whether the button is currently clicked.
-
-    Methods:
-    is_clicked() -> bool: Returns True if the button is clicked, False otherwise.
-"""
-
-
-class Button(pygame.sprite.Sprite):
-    def __init__(
-        self, text: str, text_color: tuple, bg_color: tuple, font="monospace", size=15
-    ):
-        super().__init__()
-
-        button_font = pygame.font.SysFont(font, size)
-
-        self.render_text = button_font.render(text, True, text_color)
-        text_width, text_height = self.render_text.get_size()
-
-        # Adjust dimensions based on text size and padding
-        self.width = text_width + 20
-        self.height = text_height + 20
-
-        # Create the button image (background)
-        self.image = pygame.Surface((self.width, self.height))
-        self.image.fill(bg_color)
-        self.rect = self.image.get_rect()  # This defines the button's rectangle
-
-        # center text on the rectangle
-        self.text_rect = self.render_text.get_rect(center=self.rect.center)
-
-        # Blit the text onto the button's image
-        self.image.blit(self.render_text, self.text_rect)
-
-        # mouse is not clicked
-        self.clicked = False
-
-    def is_clicked(
-        self,
-    ):  # method for an instance of the button class to detect a click
-        action = False
-        mouse_pos = pygame.mouse.get_pos()
-
-        if self.rect.collidepoint(
-            mouse_pos
-        ):  # Check if the mouse cursor is over the button's rectangle (self.rect)
-
-            # check if the left mouse has been clicked that ensure that prolonged clicking will have no effect
-            if pygame.mouse.get_pressed()[0] and not self.clicked:
-                self.clicked = True
-                action = True
-        if not pygame.mouse.get_pressed()[0]:
-            self.clicked = False
-
-        return action
-
-
-"""
-This is the Game Scenarios Linked List Module
-This module implements a linked list data structure to store and manipulate game scenarios.
-The ListNode class represents a single node in the linked list, with attributes for the node's value and the next node in the list.
-The LinkedList class represents the linked list itself, with methods for appending nodes, converting the linked list data structure to a Python list data type, and a utility functions to get the final scenarios.
-The get_game_scenarios function takes a list of game scenarios, shuffles the list randomly, and returns a linked list of the scenarios.
-
-Example:
-print(get_game_scenarios(["scenario1", "scenario2", "scenario3", "scenario4"]).to_list())
-
-Note:
-This module is designed to handle errors and exceptions, and provides informative error messages to help with debugging.
-"""
-
-
-class ListNode:
-    # Constructor to initialize the node object
-    def __init__(self, value, next=None):
-        """
-        Assign data to a node. In our project it will be the game scenario
-
-        Args:
-        -value: The value of the node
-        -next: The next node in the linked list
-
-        Returns:
-        None
-        """
-        try:
-            self.value = value
-            # Initialize next as null
-            self.next = next
-        except Exception as e:
-            print(
-                "An error occured while creating a node, please check the input values!",
-                e,
-            )
-
-
-class LinkedList:
-    def __init__(self):
-        """
-        Initialize the head of the linked list
-        """
-        try:
-            self.head = None
-        except Exception as e:
-            print("An error occured. No parameter needed!", e)
-
-    def append(self, value):
-        """
-        Create a new node and append it at the end of the linked list
-
-        Args:
-        -value: The value of the node to be appended, here it will be the game scenario
-
-        Returns:
-        None
-        """
-        try:
-            new_node = ListNode(value)
-            if not self.head:
-                self.head = new_node
-                return
-            last_node = self.head
-            while last_node.next:
-                last_node = last_node.next
-            last_node.next = new_node
-        except Exception as e:
-            print(
-                "An error occured while appending a node, please check the input values!",
-                e,
-            )
-
-    def to_list(self):
-        """
-        Convert the linked list to a list
-
-        Args:
-        None
-
-        Returns:
-        -elements: A list of the elements in the linked list
-        """
-        try:
-            elements = []
-            current = self.head
-            while current:
-                elements.append(current.value)
-                current = current.next
-            return elements
-        except Exception as e:
-            print(
-                "An error occured while converting the linked list to a list, please check the input values!",
-                e,
-            )
-
-
-"""
-The following class represents a scenario in the game. Scenario is basically an occurence in the "day" of this game.
-
-Each scenario has a unique number, an associated image for context, and a set of choices with possible outcomes.
-The luck difference attribute represents a random value that can affect the outcome of the scenario.
-
-The `set_cases()` method allows setting the caption, choices, and outcomes for the scenario.
-The `__str__()`  method returns a string representation of the scenario, including its number.
-
-Example:
-    scenario1 = Scenario(1, "path/to/image.jpg")
-    scenario1.set_cases(
-        "You are at a fork in the road.",
-        "Go left",
-        "You find a treasure!",
-        "You get lost.",
-        "Go right",
-        "You find a friend!",
-        "You get hurt.",
-    )
-    print(scenario1)  # Output: scenario1
-"""
-
-
-class Scenario:
-    def __init__(self, scene_num, picture_path: str):
-        self.picture_path = picture_path
-        self.cases = {}
-        self.scene_num = scene_num
-        self.luck_diff = randint(1, 20)
-
-    def set_cases(
-        self,
-        caption: str,
-        choice1: str,
-        pos_outcome1: str,
-        neg_outcome1: str,
-        choice2: str,
-        pos_outcome2: str,
-        neg_outcome2: str,
-    ) -> None:
-        """Must be two cases"""
-
-        self.caption = caption
-
-        # Case 1
-        self.cases["choice1"] = ["pos_outcome1", "pos_outcome2"]
-
-        self.cases["choice1"] = choice1
-        self.cases["pos_outcome1"] = pos_outcome1
-        self.cases["neg_outcome1"] = neg_outcome1
-
-        # Case 2
-        self.cases["choice2"] = choice2
-        self.cases["pos_outcome2"] = pos_outcome2
-        self.cases["neg_outcome2"] = neg_outcome2
-
-        return None
-
-    def __str__(self):
-        output_string = f"scenario{self.scene_num}"
-
-        return output_string
-
-
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-FONT_SIZE = 12
-screen_width = 600
-screen_height = 400
-
-"""
-The tree and encapsulates every scenario that exists in the game.
-The get_path() method will randomise scenarios to be put in the list to be used in the game
-"""
-
-
-class TreeNode:
-    def __init__(self, data):
-        self.data = data
-        self.left = None
-        self.right = None
-
-
-# ROOT (FIRST LAYER)
-scenario1 = Scenario(1, "Graphics/back_door_safe.png")
-scenario1.set_cases(
-    """The Day Begins.
-    Let's get you to work! 
-    Which door are you leaving your house through?""",
-    # First
-    "Front Door",
-    f"Yay! That stray cat that always "
-    f"\ngouges your eyes out is nowhere in sight!\n\nLuck +{scenario1.luck_diff}",
-    f"OW! That cat is here today, you just got scratched ;(\n\nLuck -{scenario1.luck_diff}",
-    # Second
-    "The Back Door",
-    f"Phew, narrowly escaped that nosy neighbour!\n\nLuck +{scenario1.luck_diff}",
-    f"Oh no, you tripped over that"
-    f"\nbucket of water you left out last night!\n\nLuck -{scenario1.luck_diff}",
-)
-
-
-# SECOND LAYER
-scenario2 = Scenario(2, "Graphics/puddle_fail.png")
-scenario2.set_cases(
-    "While on your way to the train station,"
-    "\nyou see a big puddle on the road, what do you do?",
-    "Jump over it",
-    f"Way to go!"
-    f"\nThose long jumps during physical\neducation coming in clutch!\n\nLuck +{scenario2.luck_diff}",
-    f"Leg days? 404 not found.\nwhat made you think you could do it?\n\nLuck -{scenario2.luck_diff}",
-    "Walk gently",
-    f"Phew! You made it, slowly but surely.\n\nLuck +{scenario2.luck_diff}",
-    f"Nuh uh those converse wont hold,\nyour feet are taking a bath.\n\nLuck -{scenario2.luck_diff}",
-)
-
-scenario3 = Scenario(2, "Graphics/phone_notif.png")
-scenario3.set_cases(
-    "Ding! Would you like to buy the lottery?",
-    "Yes!",
-    f"Oh my! You won some money!\n\nLuck +{scenario3.luck_diff}",
-    f"Uh oh, that was a scam website :o\n\nLuck -{scenario3.luck_diff}",
-    "Nah",
-    f"Good job for not getting scammed, you won a prize!\n\nLuck +{scenario3.luck_diff}",
-    f"You missed the giveaway they were doing"
-    f"\nfor everyone who bought the lottery :(\n\nLuck -{scenario3.luck_diff}",
-)
-
-# THIRD LAYER
-scenario4 = Scenario(3, "Graphics/wait_for_train.png")
-scenario4.set_cases(
-    "At the train station," "\nyou just bought coffee, oh no! that train is here!",
-    "Wait for next train",
-    f"The next train came early!"
-    f"\nYou enjoyed your coffee and got to work on time.\n\nLuck +{scenario4.luck_diff}",
-    f"the train was terminated :|\n\nLuck -{scenario4.luck_diff}",
-    "RUN FOR IT!!",
-    f"You caught the train! Off to work we go!\n\nLuck +{scenario4.luck_diff}",
-    f"You caught the train, but at what cost..."
-    f"\nYou are now drenched in coffee.\n\nLuck -{scenario4.luck_diff}",
-)
-
-scenario5 = Scenario(3, "Graphics/unexpected_project.png")
-scenario5.set_cases(
-    "Your boss just offered you a challenging project"
-    "\nthat could make or break you! What will you do?",
-    # First
-    "Accept the project",
-    f"The project made you all right! Way to go!\n\nLuck +{scenario5.luck_diff}",
-    f"The project broke you :/\n\nLuck -{scenario5.luck_diff}",
-    # Second
-    "Decline the project",
-    f"Phew! Dodged a bullet, that was never gonna work!\n\nLuck +{scenario5.luck_diff}",
-    f"Opportunity of a lifetime, down the drain!"
-    f"\n Your boss gave it to your work nemesis instead!\n\nLuck -{scenario5.luck_diff}",
-)
-
-scenario6 = Scenario(3, "Graphics/unexpected_client.png")
-scenario6.set_cases(
-    "A client decides to visit the office unexpectedly.\nWhat will you do?",
-    # First
-    "Greet the client",
-    f"Oh my! turns out he's a big shot,"
-    f"\nand you've got his name under yours!\n\nLuck +{scenario6.luck_diff}",
-    f"'Uh- is this not the toilet? Sorry.'"
-    f"\n-The man who is decidedly not a client.\n\nLuck -{scenario6.luck_diff}",
-    # Second
-    "Let him reschedule",
-    f"Turns out he's a scammer! "
-    f"\nGood thing you didn't meet with him.\n\nLuck +{scenario6.luck_diff}",
-    f"The man was a big shot and you missed it :o\n\nLuck -{scenario6.luck_diff}",
-)
-
-scenario7 = Scenario(3, "Graphics/fire_drill.png")
-scenario7.set_cases(
-    "Your office conducts an unexpected fire safety drill."
-    "\nDo you take it seriously?",
-    # First
-    "Take it seriously",
-    f"Whoa, thought that was real.\n\nLuck +{scenario7.luck_diff}",
-    f"You missed out on the chance to talk to your crush!\n\nLuck -{scenario7.luck_diff}",
-    # Second
-    "Chit-chat",
-    f"Told the best joke ever. Everyone loves me.\n\nLuck +{scenario7.luck_diff}",
-    f"Shoot, your boss is super uptight\nand is shooting you dirty looks\n\nLuck -{scenario7.luck_diff}",
-)
-
-scenario8 = Scenario(4, "Graphics/networking_event.png")
-scenario8.set_cases(
-     "You receive a last-minute invitation to a networking event."
-     "\nDo you attend or stay home?",
-     "Attend the event",
-     f"Ha! Got a huge client right then and there!\n\nLuck +{scenario8.luck_diff}",
-     f"Why host an event like this"
-     f"\nwhen watching paint dry have the same effect?\n\nLuck -{scenario8.luck_diff}",
-     "Stay home",
-     f"Apparently it was a prank by your mate,"
-     f"\nnever gonna get me in this life, pal!\n\nLuck +{scenario8.luck_diff}",
-     f"Your work nemesis got\na new client from the event! \n\nLuck -{scenario8.luck_diff}"
-)
-
-# FORTH LAYER
-
-scenario9 = Scenario(4, "Graphics/meeting.png")
-scenario9.set_cases(
-    "You receive a last-minute request \nto join an additional meeting. Do you attend?",
-    "Attend",
-    f"Finally got your chance to really\ndazzle in the meeting room today!\n\nLuck +{scenario9.luck_diff}",
-    f"The meeting is unproductive,"
-    f"\nand you fall behind on your work :(\n\nLuck -{scenario9.luck_diff}",
-    "Decline",
-    f"Boss said ouch but he fills you in anyway."
-    f"\nPays to be a favorite I guess!\n\nLuck +{scenario9.luck_diff}",
-    f"Could've been your chance to shine :("
-    f"\nChance was given to your work nemesis instead.\n\nLuck -{scenario9.luck_diff}",
-)
-
-scenario10 = Scenario(4, "Graphics/exercise.png")
-scenario10.set_cases(
-     "Feeling energetic, you consider going for \nan evening jog. Do you hit the park or the gym treadmill?",
-     "Jog in the park",
-     f"Met your crush at the park,\nmight start running every day tbh.\n\nLuck +{scenario10.luck_diff}",
-     f"It starts raining so heavily all of a sudden.\nWelp.\n\nLuck -{scenario10.luck_diff}",
-     "Gym treadmill",
-     f"You're a runner, you're a track star. \n\nLuck +{scenario10.luck_diff}",
-     f"The gym SMELLED SO BAD. YUCK. \n\nLuck -{scenario10.luck_diff}",
- )
-
-scenario11 = Scenario(4, "Graphics/grocery.png")
-scenario11.set_cases(
-     "You realize you need groceries. Do you stop\nby the store or order delivery?",
-     "Grocery Store",
-     f"What a steal! Everything you need is on sale!\n\nLuck +{scenario11.luck_diff}",
-     f"The store is super crowded,\ncould've been home by now :/\n\nLuck -{scenario11.luck_diff}",
-     "Delivery.",
-     f"It came with an extra saving deal!!\n\nLuck +{scenario11.luck_diff}",
-     f"The delivery is late and missing items."
-     f"\nGuess you'll have to live without eggs for the week.\n\nLuck -{scenario11.luck_diff}",
- )
-
-scenario12 = Scenario(4, "Graphics/dinner.png")
-scenario12.set_cases(
-    "It's time for dinner, but you're not in\nthe mood to cook. Do you order in or go out to eat?",
-    "Order in",
-    f"Mhmm Best Korean place in town!!\n\nLuck +{scenario12.luck_diff}",
-    f"They got your order wrong...\n\nLuck -{scenario12.luck_diff}",
-    "Eat out",
-    f"Nothing beats a good meal with good vibes!\n\nLuck +{scenario12.luck_diff}",
-    f"The restaurant is full.\nWaiter said next queue is in 3hrs.\n\nLuck -{scenario12.luck_diff}",
-)
-
-scenario13 = Scenario(4, "Graphics/relax.png")
-scenario13.set_cases(
-     "You feel the need to unwind.\nDo you read a book or watch a movie?",
-     "Read a book",
-     f"Instant favorite book. SO GOOD!\n\nLuck +{scenario13.luck_diff}",
-     f"Words.. so many words.. \n\nLuck -{scenario13.luck_diff}",
-     "Watch a movie",
-     f"Your favorite actor was a surprise cameo!!\n\nLuck +{scenario13.luck_diff}",
-     f"Your mum called but you didn't\nhear your phone ring. She's mad now.\n\nLuck -{scenario13.luck_diff}",
- )
-
-scenario14 = Scenario(4, "Graphics/online_class.png")
-scenario14.set_cases(
-     "You remember you’ve signed up for an online course. "
-     "\nDo you want to catch up on the lessons?",
-     "Catch up",
-     f"Got a special achievement, go you!\n\nLuck +{scenario14.luck_diff}",
-     f"You were so caught up in the course,\nyou forgot to complete your work!\n\nLuck -{scenario14.luck_diff}",
-     "Relax",
-     f"You take the evening off,\nand now you're more productive than ever!\n\nLuck +{scenario14.luck_diff}",
-     f"You just lost your 10-day streak!!!\n\nLuck -{scenario14.luck_diff}",
- )
-
-scenario15 = Scenario(4, "Graphics/local_class.png")
-scenario15.set_cases(
-     "You have the option to attend a \nlocal evening class. Which will you choose?",
-     "Yoga",
-     f"Met your crush at the class."
-     f"\nbest. yoga. class. ever.\n\nLuck +{scenario15.luck_diff}",
-     f"It gives you SUCH cramps the next day.\n\nLuck -{scenario15.luck_diff}",
-     "Cooking",
-     f"You learn a new recipe \nthat becomes a new favorite at home!!\n\nLuck +{scenario15.luck_diff}",
-     f"You dropped the whole bottle of salt,\nwho knew mushroom soup was so tricky?\n\nLuck -{scenario15.luck_diff}",
- )
-
-
-# Scenarios Tree
-Node1 = TreeNode(scenario1)
-# Second Level
-Node2 = TreeNode(scenario2)
-Node3 = TreeNode(scenario3)
-
-# Third Level
-Node4 = TreeNode(scenario4)
-Node5 = TreeNode(scenario5)
-
-Node6 = TreeNode(scenario6)
-Node7 = TreeNode(scenario7)
-
-# Fourth Level
-Node8 = TreeNode(scenario8)
-Node9 = TreeNode(scenario9)
-
-Node10 = TreeNode(scenario10)
-Node11 = TreeNode(scenario11)
-
-Node12 = TreeNode(scenario12)
-Node13 = TreeNode(scenario13)
-
-Node14 = TreeNode(scenario14)
-Node15 = TreeNode(scenario15)
-
-
-# building the tree
-root = Node1
-
-# 2ND LEVEL
-root.left, root.right = Node2, Node3
-
-# 3RD & 4TH LEVELS
-nodes = [Node2, Node3, Node4, Node5, Node6, Node7]
-children = [
-    Node4,
-    Node5,
-    Node6,
-    Node7,
-    Node8,
-    Node9,
-    Node10,
-    Node11,
-    Node12,
-    Node13,
-    Node14,
-    Node15,
-]
-
-"""This list function converts the iterator produced by map into a list to force map to apply the lambda function to all the elements."""
-list(
-    map(
-        lambda x, y: setattr(x, "left", y[0]) or setattr(x, "right", y[1]),
-        nodes,
-        zip(*[children[i::2] for i in range(2)]),
-    )
-)
-"""This is a list comprehension that creates two lists from the children list.
-        The first list contains every other element from the children list, starting from the first element (children[0::2]), 
-        and the second list contains every other element, starting from the second element (children[1::2]"""
-
-
-def get_path(root):
-    if root is None:
-        return []
-    path = [root.data]
-    if root.left is None and root.right is None:
-        return path
-    else:
-        if choice([True, False]):
-            return path + get_path(root.left)
-        else:
-            return path + get_path(root.right)
-
-
-def get_game_scenarios(instances_list):
-    """
-    Create a linked list of the game scenarios
-
-    Args:
-    -instances: A list of the game scenarios
-
-    Returns:
-    -linked_list: A linked list of the game scenarios
-    """
-    try:
-        linked_list = LinkedList()
-        for instance in instances_list:
-            linked_list.append(instance)
-        return linked_list
-    except Exception as e:
-        print("List needed to be passed, please check input.", e)
-
-
-class Game:
-    """
-    This is the main game logic with event handlers and methods to display the screen on which the events are occuring.
-    """
-
-    def __init__(self):
-        pygame.init()
-        pygame.display.set_caption("LUCKOMETER")
-        self.state = "menu"
-        self.screen = pygame.display.set_mode((600, 400))
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("monospace", FONT_SIZE)
-        self.luck_score = randint(5, 20)
-        self.scenarios_Linked_list = None
-        self.current_state = None
-        self.buttons = {}
-        self.initialise_buttons()
-        self.current_screen = ""
-        self.logfile = open("luckometer.log", "w")  # Event Logging File
-        self.main_music = pygame.mixer.Sound(os.path.join("audio/intro.wav"))
-        self.end_music = pygame.mixer.Sound(os.path.join("audio/not-really-lost.wav"))
-
-    def display_text(
-        self,
-        text: str,
-        text_color: tuple,
-        bg_color=None,
-        x="centre",
-        y="centre",
-        font="comic sans",
-        size=FONT_SIZE,
-    ) -> None:
-        font = pygame.font.SysFont(font, size)
-        lines = text.split("\n")
-        line_surfaces = [
-            font.render(line, True, text_color, bg_color) for line in lines
-        ]
-        # Calculating the x and y coordinates to center the instruction on the screen
-        if x == "centre":
-            x = (
-                screen_width
-                - max(line_surface.get_width() for line_surface in line_surfaces)
-            ) / 2
-        if y == "centre":
-            y = (
-                screen_height
-                - sum(line_surface.get_height() for line_surface in line_surfaces)
-            ) / 2
-
-        # Finally blitting each line to the screen
-        for i, line_surface in enumerate(line_surfaces):
-            self.screen.blit(line_surface, (x, y + i * (line_surface.get_height())))
-
-        return None
-
-    def display_scenario(self, scenario: Scenario) -> None:
-        self.create_button(f"s{scenario.scene_num}_choice1", scenario.cases["choice1"])
-        self.create_button(f"s{scenario.scene_num}_choice2", scenario.cases["choice2"])
-        self.screen.fill("white")
-        self.display_text(f"Luck Score: {self.luck_score}", BLACK, x=10, y=10, size=12)
-        self.display_text(scenario.caption, BLACK, x=45, y=40, size=20)
-        self.display_image(scenario.picture_path, 25, 137)
-        self.draw_button(
-            f"s{scenario.scene_num}_choice1",
-            320,
-            186,
-        )
-        self.draw_button(f"s{scenario.scene_num}_choice2", 320, 246)
-        self.draw_button("home", 530, 10)
-
-        self.log_event(f"{scenario} displayed")
-        self.current_screen = f"{scenario}"
-        return None
-
-    def display_image(self, image_path: str, x: int, y: int) -> None:
-        img = pygame.image.load(image_path).convert()
-        self.screen.blit(img, (x, y))
-        return None
-
-    def log_event(self, event) -> None:
-        """Logs events and the timestamp when they occur."""
-        timestamp = (
-            pygame.time.get_ticks()
-        )  # Gets the number of milliseconds since pygame.init() was called
-        log_message = f"{timestamp / 1000}s: {event}\n"
-        self.logfile.write(log_message)
-        print(log_message)
-        return None
-
-    def initialise_scenarios(self) -> None:
-        scenario_list = get_path(Node1)
-        self.scenarios_Linked_list = get_game_scenarios(scenario_list)
-        if self.scenarios_Linked_list and self.scenarios_Linked_list.head:
-            self.current_state = self.scenarios_Linked_list.head
-        return None
-
-    def handle_events(self) -> None:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.log_event("QUIT CLICKED")
-                pygame.quit()
-                self.logfile.close()
-                exit()
-
-            if self.current_screen in ("start", "end"):
-                if self.buttons["quit"].is_clicked():
-                    self.log_event("QUIT BUTTON CLICKED")
-                    pygame.quit()
-                    self.logfile.close()
-                    exit()
-
-            if self.current_screen == "start":
-                if self.buttons["start"].is_clicked():
-                    if not self.current_state:  # only execute 'start' if scenarios have yet to be initialised
-                        self.log_event("START BUTTON CLICKED")
-                        self.display_instructions_screen()
-                    else:
-                        self.display_text(
-                            "You have already started the game.\npress SPACE and click resume.",
-                            BLACK,
-                            WHITE,
-                            size=17)
-                        self.log_event("Error message shown")
-
-                if self.buttons["resume"].is_clicked():
-                    self.log_event("RESUME BUTTON CLICKED")
-                    try:
-                        self.display_scenario(self.current_state.value)
-
-                    except AttributeError:  # handle error when self.current_state is None
-                        self.display_text(
-                            "You have not started the game.\npress SPACE and click start.",
-                            BLACK,
-                            WHITE,
-                            size=17)
-                        self.log_event("Error message shown")
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                    self.log_event("SPACEBAR PRESSED")
-                    self.display_start_screen()
-
-            if self.current_screen == "instruction":
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                    self.log_event("SPACEBAR PRESSED")
-
-                    pygame.mixer.Sound.set_volume(self.main_music, 0.3)
-                    play_music = lambda music: (
-                        (lambda: music.play(loops=6))()
-                        if music
-                        else (lambda: self.log_event("Error playing music"))()
-                    )
-                    play_music(self.main_music)
-                    self.log_event("Intro Music Playing")
-                    self.initialise_scenarios()
-                    self.display_scenario(self.current_state.value)
-
-            if "scenario" in self.current_screen:
-                if self.buttons["home"].is_clicked():
-                    self.log_event("HOME BUTTON CLICKED")
-                    self.display_start_screen()
-
-            if self.current_screen == "scenario1":
-                if self.buttons["s1_choice1"].is_clicked():
-                    self.log_event("s1_choice1 CLICKED")
-                    self.display_outcome(1)
-                if self.buttons["s1_choice2"].is_clicked():
-                    self.log_event("s1_choice2 CLICKED")
-                    self.display_outcome(2)
-                if self.buttons["continue"].is_clicked():
-                    self.log_event("CONTINUE CLICKED")
-                    self.current_state = self.current_state.next
-                    self.display_scenario(self.current_state.value)
-
-            if self.current_screen == "scenario2":
-                if self.buttons["s2_choice1"].is_clicked():
-                    self.log_event("s2_choice1 CLICKED")
-                    self.display_outcome(1)
-                if self.buttons["s2_choice2"].is_clicked():
-                    self.log_event("s2_choice2 CLICKED")
-                    self.display_outcome(2)
-                if self.buttons["continue"].is_clicked():
-                    self.log_event("CONTINUE CLICKED")
-                    self.current_state = self.current_state.next
-                    self.display_scenario(self.current_state.value)
-
-            if self.current_screen == "scenario3":
-                if self.buttons["s3_choice1"].is_clicked():
-                    self.log_event("s3_choice1 CLICKED")
-                    self.display_outcome(1)
-                if self.buttons["s3_choice2"].is_clicked():
-                    self.log_event("s3_choice2 CLICKED")
-                    self.display_outcome(2)
-                if self.buttons["continue"].is_clicked():
-                    self.log_event("CONTINUE CLICKED")
-                    self.current_state = self.current_state.next
-                    self.display_scenario(self.current_state.value)
-
-            if self.current_screen == "scenario4":
-                if self.buttons["s4_choice1"].is_clicked():
-                    self.log_event("s4_choice1 CLICKED")
-                    self.display_outcome(1)
-                if self.buttons["s4_choice2"].is_clicked():
-                    self.log_event("s4_choice2 CLICKED")
-                    self.display_outcome(2)
-                if self.buttons["continue"].is_clicked():
-                    self.log_event("CONTINUE CLICKED")
-
-                    self.main_music.stop()
-                    self.log_event("Intro Music Stopping")
-                    end_music = lambda music: (
-                        (lambda: music.play())()
-                        if music
-                        else (lambda: self.log_event("Error playing music"))()
-                    )
-                    end_music(self.main_music)
-                    pygame.mixer.Sound.set_volume(self.end_music, 0.3)
-                    self.end_music.play()
-                    self.log_event("End Music Playing")
-                    self.display_end_screen()
-
-            if self.current_screen == "end":
-                if self.buttons["play_again"].is_clicked():
-                    self.log_event("PLAY AGAIN BUTTON CLICKED")
-                    self.end_music.stop()
-                    self.log_event("End Music Stopping")
-                    self.luck_score = randint(5, 20)  # recalibrate initial luck score
-                    self.current_state = None  # reset scenarios
-                    self.display_start_screen()
-        return None
-
-    def create_button(
-        self,
-        name: str,
-        text: str,
-        text_color=(167, 66, 132),
-        bg_color=(221, 229, 13),
-        font="monospace",
-        size=20,
-    ) -> None:
-        """
-        :param name: name of button
-        :param text: text to be put as button
-        :param text_color: default color set to (167,66,132)->(dark purple)
-        :param bg_color: default bg color set to (221,229,13)->(neon yellow)
-        :param font: default font set to monospace
-        :param size: default font size set to 20
-
-        :return: None
-        """
-        button = Button(text, text_color, bg_color, font, size)
-        self.buttons[name] = button  # each button added to dictionary to be used in handle_events()
-
-        return None
-
-    def draw_button(self, name: str, x="centre", y="centre") -> None:
-        """
-        :param name: name of button to be drawn on screen
-        :param x: default set to align centre
-        :param y: default set to align centre
-
-        :return: None
-        """
-        # setting x and y coordinates
-        if x == "centre":
-            x = (screen_width - self.buttons[name].width) / 2
-        if y == "centre":
-            y = (screen_height - self.buttons[name].height) / 2
-
-        self.buttons[name].rect.topleft = (x, y)
-        self.screen.blit(self.buttons[name].image, (self.buttons[name].rect.x, self.buttons[name].rect.y))
-
-        return None
-
-    def initialise_buttons(self):
-        self.create_button("start", "START")
-        self.create_button("resume", "RESUME")
-        self.create_button("quit", "QUIT")
-        self.create_button("play_again", "PLAY AGAIN")
-        self.create_button("home", "HOME", size=15)
-        self.create_button("continue", "CONTINUE")
-
-    def display_start_screen(self):
-        self.display_image("Graphics/title_screen.png", 0, 0)
-        self.draw_button("start", y=176)
-        self.draw_button("resume", y=225)
-        self.draw_button("quit", y=274)
-
-        self.log_event("START SCREEN DISPLAYED")
-        self.current_screen = "start"
-
-    def display_instructions_screen(self):
-        self.display_image("Graphics/instructions.png", 0, 0)
-
-        # Defining the instructions text
-        instruction = """
-        The game begins at home, you start off with a randomised 
-        luck score(between 5 to 20). Each decision you make 
-        will have an impact that can be anything from 1 to 20!
-        Remember, this is a game of luck, so no matter how sound
-        your choice may seem, there is always a twist. 
-        Your aim is to have over 50 luck at the end of the game. 
-        Good Luck!
-        """
-
-        self.display_text(instruction, WHITE, x=20, size=17)
-        self.log_event("INSTRUCTIONS SCREEN DISPLAYED")
-        self.current_screen = "instruction"
-
-    def display_outcome(self, choice_num):
-
-        # nested function in order to retrieve the key(eg. 'pos_outcome1') given the outcome(eg. 'Won the lottery')
-        def get_key(search_value):
-            for key, value in self.current_state.value.cases.items():
-                if value == search_value:
-                    return key
-            return None
-
-        outcomes = [
-            self.current_state.value.cases[f"pos_outcome{choice_num}"],
-            self.current_state.value.cases[f"neg_outcome{choice_num}"],
-        ]
-        outcome = choice(outcomes)
-
-        if "pos" in get_key(outcome):
-            self.luck_score += self.current_state.value.luck_diff
-            self.log_event("positive outcome displayed")
-        if "neg" in get_key(outcome):
-            self.luck_score -= self.current_state.value.luck_diff
-            self.log_event("negative outcome displayed")
-
-        self.screen.fill(WHITE)
-        self.display_text(f"Luck Score: {self.luck_score}", BLACK, x=10, y=10, size=12)
-        self.display_text(outcome, BLACK, size=20)
-        self.draw_button("continue", 448, 340)
-
-    def display_end_screen(self):
-        self.display_image("Graphics/end_screen.png", 0, 0)
-
-        if self.luck_score > 50:
-            self.display_text(
-                f"Your Final Luck Score is {self.luck_score}.\nIt's your lucky day!",
-                BLACK,
-                WHITE,
-                y=100,
-                size=20,
-            )
-
-        if 20 <= self.luck_score <= 50:
-            self.display_text(
-                f"Your Final Luck Score is {self.luck_score}."
-                f"\nIt's just like any other day.",
-                BLACK,
-                WHITE,
-                y=100,
-                size=20,
-            )
-
-        if self.luck_score < 20:
-            self.display_text(
-                f"Your Final Luck Score is {self.luck_score}."
-                f"\nUh oh, a black cat may be around the corner!",
-                BLACK,
-                WHITE,
-                y=100,
-                size=20,
-            )
-
-        self.draw_button("play_again", y=176)
-        self.draw_button("quit", y=225)
-
-        self.log_event("END SCREEN DISPLAYED")
-        self.current_screen = "end"
-
-    def run(self):
-        self.screen.fill((0, 0, 0))
-        self.current_screen = "start"
-        self.display_start_screen()
-
-        while True:
-
-            self.handle_events()
-            pygame.display.flip()
-            self.clock.tick(60)
-
-
-# checks that the program runs only as an executable and not as an import
-if __name__ == "__main__":
-    game = Game()
-    game.run()
+import time
+
+_import_started = time.perf_counter()  # for the startup profiler, before pygame and the game modules load
+
+import argparse  # noqa: E402
+import pygame  # noqa: E402
+import random  # noqa: E402
+from collections import deque  # noqa: E402
+from sys import exit  # noqa: E402
+
+from audio import END_MUSIC, INTRO_MUSIC, MUSIC_END, MusicPlayer  # noqa: E402
+from assets import ASSET_LOADED, AssetLoader, Atlas, SurfaceCache, get_font, render_text  # noqa: E402
+from eventlog import EventLogger  # noqa: E402
+from engine import END_MESSAGES, resolve_outcome, score_band, starting_score  # noqa: E402
+from profiling import FrameProfiler, StartupProfiler  # noqa: E402
+from renderer import DirtyRectRenderer  # noqa: E402
+from scenarios import Scenario, get_game_scenarios, scenario_tree  # noqa: E402
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+"""
+    Below is a clickable button class for Pygame.
+
+    Parameters:
+    text (str): The text to display on the button.
+    text_color (tuple): The color of the text.
+    bg_color (tuple): The background color of the button.
+    font (str, optional): The font to use. Defaults to "monospace".
+    size (int, optional): The font size. Defaults to 15.
+
+    Attributes:
+    width (int): The width of the button.
+    height (int): The height of the button.
+    image (pygame.Surface): The button's image.
+    variants (dict): The "normal", "hover" and "pressed" images, all rendered when the button is created.
+    rect (pygame.Rect): The button's rectangle.
+    text_rect (pygame.Rect): The text's rectangle.
+    clicked (bool): Whether the button is currently clicked.
+
+    Methods:
+    is_clicked() -> bool: Returns True if the button is clicked, False otherwise. The game itself resolves clicks
+    from mouse events with a ButtonGrid instead, this polling method is kept for scripts that use Button on its own.
+"""
+
+
+class Button(pygame.sprite.Sprite):
+    def __init__(
+        self, text: str, text_color: tuple, bg_color: tuple, font="monospace", size=15
+    ):
+        super().__init__()
+
+        # the font and the rendered label are shared with every other button using the same text and style
+        self.render_text = render_text(text, text_color, font=font, size=size)
+        text_width, text_height = self.render_text.get_size()
+
+        # Adjust dimensions based on text size and padding
+        self.width = text_width + 20
+        self.height = text_height + 20
+
+        # Create the button images (background), lighter when hovered and darker when pressed
+        bg_color = pygame.Color(bg_color)
+        self.variants = {
+            "normal": pygame.Surface((self.width, self.height)),
+            "hover": pygame.Surface((self.width, self.height)),
+            "pressed": pygame.Surface((self.width, self.height)),
+        }
+        self.variants["normal"].fill(bg_color)
+        self.variants["hover"].fill(bg_color.lerp(WHITE, 0.35))
+        self.variants["pressed"].fill(bg_color.lerp(BLACK, 0.2))
+        self.image = self.variants["normal"]
+        self.rect = self.image.get_rect()  # This defines the button's rectangle
+
+        # center text on the rectangle
+        self.text_rect = self.render_text.get_rect(center=self.rect.center)
+
+        # Blit the text onto the button's images
+        for image in self.variants.values():
+            image.blit(self.render_text, self.text_rect)
+
+        # mouse is not clicked
+        self.clicked = False
+
+    def is_clicked(
+        self,
+    ):  # method for an instance of the button class to detect a click
+        action = False
+        mouse_pos = pygame.mouse.get_pos()
+
+        if self.rect.collidepoint(
+            mouse_pos
+        ):  # Check if the mouse cursor is over the button's rectangle (self.rect)
+
+            # check if the left mouse has been clicked that ensure that prolonged clicking will have no effect
+            if pygame.mouse.get_pressed()[0] and not self.clicked:
+                self.clicked = True
+                action = True
+        if not pygame.mouse.get_pressed()[0]:
+            self.clicked = False
+
+        return action
+
+
+"""
+The ButtonPool class builds each distinct button once and hands the same Button out again afterwards.
+A button is identified by its text and style, so showing a scenario again after HOME -> RESUME, or two
+screens with the same "QUIT" button, reuse the button and its pre-rendered images instead of building new ones.
+
+Example:
+pool = ButtonPool()
+pool.get("QUIT", (167, 66, 132), (221, 229, 13)) is pool.get("QUIT", (167, 66, 132), (221, 229, 13))  # True
+print(pool.stats())  # {'size': 1, 'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+"""
+
+
+class ButtonPool:
+    def __init__(self):
+        self.buttons = {}  # (text, text_color, bg_color, font, size) -> Button
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.buttons)
+
+    def get(self, text: str, text_color, bg_color, font="monospace", size=15) -> Button:
+        key = (text, text_color, bg_color, font, size)
+        button = self.buttons.get(key)
+        if button is None:
+            self.misses += 1
+            button = self.buttons[key] = Button(text, text_color, bg_color, font, size)
+        else:
+            self.hits += 1
+        return button
+
+    def stats(self) -> dict:
+        requests = self.hits + self.misses
+        return {
+            "size": len(self.buttons),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+        }
+
+
+"""
+The LazyButtons class maps button names to buttons like a dictionary, but a button is only built, and its
+font looked up, the first time its name is used. Game.create_button() records what the button should look
+like, so buttons for screens the player never reaches cost nothing at startup.
+
+Example:
+buttons = LazyButtons(ButtonPool())
+buttons.define("quit", "QUIT", (167, 66, 132), (221, 229, 13), "monospace", 20)
+buttons["quit"].rect  # the button is built here
+"""
+
+
+class LazyButtons(dict):
+    def __init__(self, pool: ButtonPool):
+        super().__init__()
+        self.pool = pool
+        self.specs = {}  # name -> (text, text_color, bg_color, font, size)
+
+    def define(self, name: str, text: str, text_color, bg_color, font, size) -> None:
+        """Records how to build the button called name, replacing any button built under that name."""
+        self.specs[name] = (text, text_color, bg_color, font, size)
+        self.pop(name, None)
+        return None
+
+    def __missing__(self, name: str) -> Button:
+        button = self[name] = self.pool.get(*self.specs[name])
+        return button
+
+
+"""
+The ButtonGrid class is a spatial index of the buttons drawn on the current screen.
+The screen is divided into square cells and every button is listed in the cells its rectangle overlaps, so
+finding the button under a click only looks at the few buttons sharing that click's cell, however many
+buttons the screen has. The game clears it whenever a new screen is drawn.
+
+Example:
+grid = ButtonGrid()
+grid.add("start", pygame.Rect(260, 176, 80, 40))
+print(grid.hit((300, 190)))  # Output: start
+"""
+
+
+class ButtonGrid:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> list of (rect, name), in the order the buttons were drawn
+        self.rects = {}  # name -> rect
+
+    def __len__(self):
+        return len(self.rects)
+
+    def _cells_of(self, rect):
+        size = self.cell_size
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield column, row
+
+    def add(self, name: str, rect) -> None:
+        """Registers a button at rect, replacing any earlier position of a button with the same name."""
+        if name in self.rects:
+            self.remove(name)
+        rect = pygame.Rect(rect)  # a copy, the button's own rect moves when it is drawn somewhere else
+        self.rects[name] = rect
+        for cell in self._cells_of(rect):
+            self.cells.setdefault(cell, []).append((rect, name))
+        return None
+
+    def remove(self, name: str) -> None:
+        rect = self.rects.pop(name)
+        for cell in self._cells_of(rect):
+            self.cells[cell] = [entry for entry in self.cells[cell] if entry[1] != name]
+        return None
+
+    def clear(self) -> None:
+        self.cells.clear()
+        self.rects.clear()
+        return None
+
+    def hit(self, position):
+        """Returns the name of the button at position, the last drawn one if buttons overlap, or None."""
+        x, y = position
+        cell = (int(x) // self.cell_size, int(y) // self.cell_size)
+        for rect, name in reversed(self.cells.get(cell, ())):
+            if rect.collidepoint(x, y):
+                return name
+        return None
+
+
+FONT_SIZE = 12
+FPS = 60
+FRAME_CACHE_BYTES = 24 * 1024 * 1024  # about 25 pre-composited 600x400 frames
+screen_width = 600
+screen_height = 400
+TITLE_SCREEN = "graphics/title_screen.png"
+OVERLAY_INTERVAL = 0.25  # seconds between updates of the profiler overlay
+
+# type recorded in the event log for messages ending in each word
+EVENT_TYPES = {
+    "clicked": "click",
+    "pressed": "key",
+    "displayed": "screen",
+    "shown": "screen",
+    "playing": "music",
+    "stopping": "music",
+}
+
+
+def event_type_of(event: str) -> str:
+    """Guesses the type of a logged event from its last word, e.g. "START BUTTON CLICKED" -> "click"."""
+    last_word = event.split()[-1].lower() if event.strip() else ""
+    return EVENT_TYPES.get(last_word, "info")
+
+
+class Game:
+    """
+    This is the main game logic with event handlers and methods to display the screen on which the events are occuring.
+    """
+
+    def __init__(
+        self,
+        log_to_stdout=True,
+        window_size=(screen_width, screen_height),
+        fullscreen=False,
+        seeds=None,
+        logger=None,
+        profile_frames=None,
+    ):
+        """
+        :param log_to_stdout: also print logged events to the terminal, default True
+        :param window_size: size of the resizable window in pixels, default 600x400. The layout is scaled to fit.
+        :param fullscreen: fill the display at its native resolution instead of opening a window
+        :param seeds: seeds for the first sessions, in order, e.g. those of a log being replayed. Sessions
+                      after these get a random seed.
+        :param logger: where events are logged, defaults to an EventLogger writing luckometer.log
+        :param profile_frames: file to write every frame's timings to, which also turns the frame profiler on.
+                               It can be turned on at any time with F3, which also shows its overlay.
+        """
+        self.started = time.perf_counter()  # log timestamps count from here
+        self.profiler = StartupProfiler()
+        self.profiler.add("import", IMPORT_SECONDS)
+        self.frame_profiler = FrameProfiler()  # off unless profile_frames is given or F3 is pressed
+        if profile_frames:
+            self.frame_profiler.enable(profile_frames)
+        self.overlay_shown = False
+        self.overlay_updated = 0.0
+
+        # only what the start screen needs: the mixer starts on the first sound, see MusicPlayer
+        with self.profiler.stage("pygame init"):
+            pygame.display.init()
+            pygame.font.init()
+            pygame.display.set_caption("LUCKOMETER")
+            if fullscreen:
+                self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            else:
+                self.screen = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+        self.state = "menu"
+        # all drawing goes through it, in 600x400 logical coordinates, to be scaled and to track changed regions
+        self.renderer = DirtyRectRenderer(self.screen, (screen_width, screen_height))
+        self.clock = pygame.time.Clock()
+        self.seeds = iter(seeds or ())
+        self.session_seed = None
+        self.rng = None  # random.Random of the current session, see new_session()
+        self.luck_score = 0
+        self.scenarios_Linked_list = None
+        self.current_state = None
+        self.button_pool = ButtonPool()  # every distinct button is built once and reused
+        self.buttons = LazyButtons(self.button_pool)  # a button is built the first time it is drawn
+        self.hit_index = ButtonGrid()  # the buttons on the current screen, for resolving clicks
+        self.hovered = None  # name of the button under the mouse, drawn with its hover image
+        self.initialise_buttons()
+        self.build_handlers()
+        self.current_screen = ""
+        with self.profiler.stage("font discovery"):
+            get_font("monospace", 20)  # the start screen's buttons
+        with self.profiler.stage("asset loading"):
+            self.atlas = Atlas()  # every picture in a few sheets, if build_atlas.py has been run
+            self.image_cache = SurfaceCache()  # decoded images, so screen changes do not touch the disk
+            self.load_image(TITLE_SCREEN)
+        self.assets = AssetLoader()  # decodes the next route's pictures while the title screens are up
+        self.next_route = None  # scenarios of the next day, sampled while the start screen is shown
+        self.frames = SurfaceCache(FRAME_CACHE_BYTES)  # pre-composited scenario and outcome screens
+        self.frame_buttons = {}  # frame key -> {button name: rect} of the buttons drawn into that frame
+        self.frame_regions = {}  # frame key -> (background colour, logical rects drawn over it) of that frame
+        self.warmup_queue = deque()  # (frame key, draw function) pairs to composite while the game is idle
+        self.run_started = None
+        self.idle_seconds = 0.0  # time the main loop spent waiting for events or for the fps cap
+        self.logger = logger or EventLogger("luckometer.log", echo=log_to_stdout)  # writes on a background thread
+        self.music = MusicPlayer()  # opens the audio device and loads the cues on the first sound
+        self.new_session()
+
+    def display_text(
+        self,
+        text: str,
+        text_color: tuple,
+        bg_color=None,
+        x="centre",
+        y="centre",
+        font="comic sans",
+        size=FONT_SIZE,
+    ) -> None:
+        lines = text.split("\n")
+        with self.frame_profiler.span("text"):
+            line_surfaces = [
+                render_text(line, text_color, bg_color, font, size) for line in lines
+            ]
+        # Calculating the x and y coordinates to center the instruction on the screen
+        if x == "centre":
+            x = (
+                screen_width
+                - max(line_surface.get_width() for line_surface in line_surfaces)
+            ) / 2
+        if y == "centre":
+            y = (
+                screen_height
+                - sum(line_surface.get_height() for line_surface in line_surfaces)
+            ) / 2
+
+        # Finally blitting each line to the screen
+        for i, (line, line_surface) in enumerate(zip(lines, line_surfaces)):
+            self.renderer.blit(
+                line_surface,
+                (x, y + i * (line_surface.get_height())),
+                key=("text", line, text_color, bg_color, font, size),
+            )
+
+        return None
+
+    def compose_frame(self, key, draw):
+        """
+        Return the off-screen frame for key, building it on a cache miss by running draw() with every
+        display_* and draw_button call pointed at a new surface instead of the screen.
+
+        :param key: identifies the frame, e.g. ("scenario", scenario)
+        :param draw: function with no arguments that draws the frame
+
+        :return: the frame surface. The buttons drawn into it are kept in self.frame_buttons[key], and its
+                 background and the rectangles drawn over it in self.frame_regions[key].
+        """
+
+        def build():
+            frame = pygame.Surface((screen_width, screen_height)).convert()  # logical size, scaled when shown
+            screen_renderer, screen_buttons = self.renderer, self.hit_index
+            self.renderer, self.hit_index = DirtyRectRenderer(frame), ButtonGrid()
+            try:
+                draw()
+                self.frame_buttons[key] = dict(self.hit_index.rects)
+                self.frame_regions[key] = (self.renderer.background, list(self.renderer.changed))
+            finally:
+                self.renderer, self.hit_index = screen_renderer, screen_buttons
+            return frame
+
+        frame = self.frames.get(key, build)
+        if len(self.frame_buttons) > len(self.frames):  # frames evicted from the cache take their buttons along
+            for stale in [key for key in self.frame_buttons if key not in self.frames]:
+                del self.frame_buttons[stale]
+                del self.frame_regions[stale]
+        return frame
+
+    def show_frame(self, key, draw) -> None:
+        """
+        Shows a pre-composited frame with a single blit and makes the buttons drawn into it clickable. Only the
+        parts of the frame and of the previous screen drawn over the background are pushed to the display.
+        """
+        frame = self.compose_frame(key, draw)
+        self.clear_buttons()
+        self.renderer.blit_frame(frame, *self.frame_regions[key], key=("frame", key))
+        for name, rect in self.frame_buttons[key].items():
+            self.buttons[name].rect.topleft = rect.topleft
+            self.hit_index.add(name, rect)
+        return None
+
+    def warm_up_step(self) -> None:
+        """Composites the next queued frame. Called by the main loop when there are no events to handle."""
+        key, draw = self.warmup_queue.popleft()
+        # also scale it for the window while idle, as long as that does not push out frames scaled earlier
+        self.renderer.prescale(self.compose_frame(key, draw), ("frame", key))
+        return None
+
+    def create_choice_buttons(self, scenario: Scenario) -> None:
+        self.create_button(f"s{scenario.scene_num}_choice1", scenario.cases["choice1"])
+        self.create_button(f"s{scenario.scene_num}_choice2", scenario.cases["choice2"])
+        return None
+
+    def draw_scenario_frame(self, scenario: Scenario) -> None:
+        """Draws everything on a scenario screen except the luck score, which changes during the day."""
+        self.create_choice_buttons(scenario)
+        self.renderer.fill("white")
+        self.display_text(scenario.caption, BLACK, x=45, y=40, size=20)
+        self.display_image(scenario.picture_path, 25, 137)
+        self.draw_button(
+            f"s{scenario.scene_num}_choice1",
+            320,
+            186,
+        )
+        self.draw_button(f"s{scenario.scene_num}_choice2", 320, 246)
+        self.draw_button("home", 530, 10)
+        return None
+
+    def draw_outcome_frame(self, outcome: str) -> None:
+        """Draws everything on an outcome screen except the luck score."""
+        self.renderer.fill(WHITE)
+        self.display_text(outcome, BLACK, size=20)
+        self.draw_button("continue", 448, 340)
+        return None
+
+    def display_scenario(self, scenario: Scenario) -> None:
+        self.create_choice_buttons(scenario)
+        self.show_frame(("scenario", scenario), lambda: self.draw_scenario_frame(scenario))
+        self.display_text(f"Luck Score: {self.luck_score}", BLACK, x=10, y=10, size=12)
+
+        self.log_event(f"{scenario} displayed")
+        self.current_screen = f"{scenario}"
+        return None
+
+    def display_image(self, image_path: str, x: int, y: int) -> None:
+        with self.frame_profiler.span("image"):
+            img = self.load_image(image_path)
+        self.renderer.blit(img, (x, y), key=("image", image_path))
+        return None
+
+    def load_image(self, image_path: str):
+        """Returns the decoded picture, from the atlas if it is packed there and from the image cache if not."""
+        img = self.atlas.get(image_path)
+        if img is None:  # not in the atlas, load the file on its own
+            img = self.image_cache.load_image(image_path)
+        return img
+
+    def log_event(self, event, event_type=None) -> None:
+        """Logs events and the timestamp when they occur."""
+        # pygame.time.get_ticks() needs the timer subsystem, which is no longer started, so count from __init__
+        timestamp = int((time.perf_counter() - self.started) * 1000)
+        self.logger.log(
+            event,
+            elapsed=timestamp / 1000,
+            screen=self.current_screen,
+            event_type=event_type or event_type_of(event),
+        )
+        return None
+
+    def new_session(self, seed=None) -> int:
+        """
+        Start a session, one day from the start screen to PLAY AGAIN, with its own random number generator.
+        Every random draw of the session comes from it, so logging the seed is enough to replay the session.
+
+        :param seed: seed of the session, defaults to the next of the seeds given to __init__ or a random one
+
+        :return: the seed
+        """
+        if seed is None:
+            seed = next(self.seeds, None)
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.session_seed = seed
+        self.rng = random.Random(seed)
+        self.next_route = None
+        self.luck_score = starting_score(self.rng)
+        self.log_event(f"SESSION SEED {seed}", event_type="session")
+        self.log_event(f"LUCK SCORE {self.luck_score}", event_type="score")
+        return seed
+
+    def prepare_route(self) -> list:
+        """
+        Sample the next day's route and get its screens ready while the player is on the title screens: the
+        pictures are decoded on the asset loader's threads, and the scenario and outcome frames are queued to
+        be composited by the main loop once the pictures have arrived.
+
+        :return: the scenarios of the route, also kept in self.next_route
+        """
+        scenario_list = scenario_tree.sample_path(self.rng)
+        for scenario in scenario_list:
+            scenario.draw_luck_diff(self.rng)  # every session gets its own luck differences
+        self.next_route = scenario_list
+        self.assets.request(
+            scenario.picture_path for scenario in scenario_list if scenario.picture_path not in self.atlas
+        )
+
+        # composite this route's scenario screens and their four outcomes each while the player reads
+        self.warmup_queue.clear()
+        for scenario in scenario_list:
+            self.warmup_queue.append(
+                (("scenario", scenario), lambda scenario=scenario: self.draw_scenario_frame(scenario))
+            )
+            for outcome_key in ("pos_outcome1", "neg_outcome1", "pos_outcome2", "neg_outcome2"):
+                outcome = scenario.outcome_text(outcome_key)
+                self.warmup_queue.append((("outcome", outcome), lambda outcome=outcome: self.draw_outcome_frame(outcome)))
+        return scenario_list
+
+    def initialise_scenarios(self) -> None:
+        scenario_list = self.next_route or self.prepare_route()
+        self.next_route = None
+        # the first scenario is about to be shown, so take whatever the loader has still not handed over
+        self.assets.collect(self.image_cache, wait_for_all=True)
+        self.image_cache.preload(  # only pictures the loader failed on are decoded here
+            scenario.picture_path for scenario in scenario_list if scenario.picture_path not in self.atlas
+        )
+        self.scenarios_Linked_list = get_game_scenarios(scenario_list)
+        if self.scenarios_Linked_list and self.scenarios_Linked_list.head:
+            self.current_state = self.scenarios_Linked_list.head
+        return None
+
+    def quit_game(self, message: str) -> None:
+        """Logs why the game is closing along with the idle share of the main loop, then exits."""
+        self.log_event(message)
+        if self.run_started is not None:
+            self.log_event(f"IDLE CPU SHARE {self.idle_share():.1%}")
+        self.log_event(f"RENDER STATS {self.renderer.stats()}")
+        self.log_event(f"BUTTON POOL {self.button_pool.stats()}")
+        self.log_event(f"FRAME CACHE {self.frames.stats()}")
+        self.log_event(f"ATLAS {self.atlas.stats()}")
+        self.log_event(f"ASSET LOADER {self.assets.stats()}")
+        if self.frame_profiler.frames:
+            self.log_event(f"FRAME PROFILE {self.frame_profiler.percentiles()}", event_type="profile")
+        self.frame_profiler.close()
+        self.assets.close()
+        self.logger.close()
+        pygame.quit()
+        exit()
+
+    def build_handlers(self) -> None:
+        """
+        Build the table of the game's state machine. Each key is a (screen, event) pair, where the event is
+        ("click", button name) or ("key", pygame key), and each value is the function handling it. The rows
+        for the scenario and outcome screens are generated for every layer of the scenario tree, so adding
+        layers needs no new handler code.
+
+        :return: None
+        """
+        quit_button = lambda: self.quit_game("QUIT BUTTON CLICKED")
+        self.handlers = {
+            ("start", ("click", "quit")): quit_button,
+            ("start", ("click", "start")): self.on_start_clicked,
+            ("start", ("click", "resume")): self.on_resume_clicked,
+            ("start", ("key", pygame.K_SPACE)): self.on_space_at_start,
+            ("instruction", ("key", pygame.K_SPACE)): self.on_day_started,
+            ("end", ("click", "quit")): quit_button,
+            ("end", ("click", "play_again")): self.on_play_again_clicked,
+        }
+        for layer in range(1, scenario_tree.depth + 1):
+            self.handlers[(f"scenario{layer}", ("click", "home"))] = self.on_home_clicked
+            for choice_num in (1, 2):
+                self.handlers[(f"scenario{layer}", ("click", f"s{layer}_choice{choice_num}"))] = (
+                    lambda layer=layer, choice_num=choice_num: self.on_choice_clicked(layer, choice_num)
+                )
+            self.handlers[(f"outcome{layer}", ("click", "continue"))] = self.on_continue_clicked
+        return None
+
+    def dispatch(self, event) -> None:
+        """Runs the handler for event on the current screen, if there is one."""
+        handler = self.handlers.get((self.current_screen, event))
+        if handler:
+            handler()
+        return None
+
+    def handle_events(self, events=None) -> None:
+        """
+        :param events: events to handle, defaults to everything waiting in the pygame event queue
+
+        :return: None
+        """
+        if events is None:
+            events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.quit_game("QUIT CLICKED")
+
+            if event.type == MUSIC_END:
+                self.music.on_music_end()
+
+            if event.type == ASSET_LOADED:  # a worker finished decoding a picture of the next route
+                self.assets.collect(self.image_cache)
+
+            if event.type == pygame.WINDOWEXPOSED:  # the window was uncovered and has to be pushed again
+                self.renderer.invalidate()
+
+            if event.type == pygame.VIDEORESIZE:
+                self.resize()
+
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:  # on every screen
+                self.toggle_profiler_overlay()
+            elif event.type == pygame.KEYDOWN:
+                self.dispatch(("key", event.key))
+
+            # a click or a mouse move is one lookup in the grid of buttons on screen, in logical coordinates
+            if event.type == pygame.MOUSEMOTION:
+                self.hover(self.hit_index.hit(self.renderer.to_logical(event.pos)))
+
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                name = self.hit_index.hit(self.renderer.to_logical(event.pos))
+                if name:
+                    self.draw_button_variant(name, "pressed")
+                    self.dispatch(("click", name))
+
+            if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                name = self.hit_index.hit(self.renderer.to_logical(event.pos))
+                if name is not None and name == self.hovered:  # the click did not change the screen
+                    self.draw_button_variant(name, "hover")
+                else:  # a new screen, with another button or none under the pointer
+                    self.hover(name)
+        return None
+
+    def resize(self) -> None:
+        """Redraws the current screen at the window's new size. The scaled surfaces of the old size are dropped."""
+        self.screen = pygame.display.get_surface()
+        self.renderer.resize(self.screen)
+        hovered, self.hovered = self.hovered, None  # the redraw shows every button in its normal image
+        self.hover(hovered)
+        self.log_event(f"WINDOW RESIZED TO {self.screen.get_width()}x{self.screen.get_height()}")
+        return None
+
+    def play_music(self, path: str, loops=0) -> None:
+        try:
+            self.music.play(path, loops)
+        except pygame.error:  # e.g. a missing or unreadable file, the game carries on without music
+            self.log_event("Error playing music")
+        return None
+
+    def on_start_clicked(self) -> None:
+        self.log_event("START BUTTON CLICKED")  # logged either way, so a replay of the log repeats the click
+        if not self.current_state:  # only execute 'start' if scenarios have yet to be initialised
+            self.display_instructions_screen()
+        else:
+            self.display_text(
+                "You have already started the game.\npress SPACE and click resume.",
+                BLACK,
+                WHITE,
+                size=17)
+            self.log_event("Error message shown")
+        return None
+
+    def on_resume_clicked(self) -> None:
+        self.log_event("RESUME BUTTON CLICKED")
+        try:
+            self.display_scenario(self.current_state.value)
+
+        except AttributeError:  # handle error when self.current_state is None
+            self.display_text(
+                "You have not started the game.\npress SPACE and click start.",
+                BLACK,
+                WHITE,
+                size=17)
+            self.log_event("Error message shown")
+        return None
+
+    def on_space_at_start(self) -> None:
+        self.log_event("SPACEBAR PRESSED")
+        self.display_start_screen()
+        return None
+
+    def on_day_started(self) -> None:
+        self.log_event("SPACEBAR PRESSED")
+
+        self.play_music(INTRO_MUSIC, loops=6)
+        self.log_event("Intro Music Playing")
+        self.initialise_scenarios()
+        self.display_scenario(self.current_state.value)
+        return None
+
+    def on_home_clicked(self) -> None:
+        self.log_event("HOME BUTTON CLICKED")
+        self.display_start_screen()
+        return None
+
+    def on_choice_clicked(self, layer: int, choice_num: int) -> None:
+        self.log_event(f"s{layer}_choice{choice_num} CLICKED")
+        self.display_outcome(choice_num)
+        return None
+
+    def on_continue_clicked(self) -> None:
+        self.log_event("CONTINUE CLICKED")
+        if self.current_state.next:
+            self.current_state = self.current_state.next
+            self.display_scenario(self.current_state.value)
+            return None
+
+        # that was the last scenario of the day
+        self.log_event("Intro Music Stopping")
+        self.play_music(END_MUSIC)  # crossfades from the intro music
+        self.log_event("End Music Playing")
+        self.display_end_screen()
+        return None
+
+    def on_play_again_clicked(self) -> None:
+        self.log_event("PLAY AGAIN BUTTON CLICKED")
+        self.music.stop()
+        self.log_event("End Music Stopping")
+        self.new_session()  # new seed and initial luck score
+        self.current_state = None  # reset scenarios
+        self.display_start_screen()
+        return None
+
+    def create_button(
+        self,
+        name: str,
+        text: str,
+        text_color=(167, 66, 132),
+        bg_color=(221, 229, 13),
+        font="monospace",
+        size=20,
+    ) -> None:
+        """
+        :param name: name of button
+        :param text: text to be put as button
+        :param text_color: default color set to (167,66,132)->(dark purple)
+        :param bg_color: default bg color set to (221,229,13)->(neon yellow)
+        :param font: default font set to monospace
+        :param size: default font size set to 20
+
+        :return: None
+        """
+        # the button is built from the pool the first time self.buttons[name] is used
+        self.buttons.define(name, text, text_color, bg_color, font, size)
+
+        return None
+
+    def draw_button(self, name: str, x="centre", y="centre") -> None:
+        """
+        :param name: name of button to be drawn on screen
+        :param x: default set to align centre
+        :param y: default set to align centre
+
+        :return: None
+        """
+        # setting x and y coordinates
+        if x == "centre":
+            x = (screen_width - self.buttons[name].width) / 2
+        if y == "centre":
+            y = (screen_height - self.buttons[name].height) / 2
+
+        self.buttons[name].rect.topleft = (x, y)
+        self.hit_index.add(name, self.buttons[name].rect)
+        self.renderer.blit(self.buttons[name].image, (self.buttons[name].rect.x, self.buttons[name].rect.y))
+
+        return None
+
+    def draw_button_variant(self, name: str, variant: str) -> None:
+        """Redraws a button already on screen with its "normal", "hover" or "pressed" image."""
+        self.renderer.overdraw(self.buttons[name].variants[variant], self.hit_index.rects[name].topleft)
+        return None
+
+    def hover(self, name) -> None:
+        """Highlights the button called name, or none if name is None, and un-highlights the previous one."""
+        if name == self.hovered:
+            return None
+        if self.hovered in self.hit_index.rects:
+            self.draw_button_variant(self.hovered, "normal")
+        if name is not None:
+            self.draw_button_variant(name, "hover")
+        self.hovered = name
+        return None
+
+    def clear_buttons(self) -> None:
+        """Forgets the buttons on screen, called before a new screen is drawn."""
+        self.hit_index.clear()
+        self.hovered = None
+        return None
+
+    def initialise_buttons(self):
+        self.create_button("start", "START")
+        self.create_button("resume", "RESUME")
+        self.create_button("quit", "QUIT")
+        self.create_button("play_again", "PLAY AGAIN")
+        self.create_button("home", "HOME", size=15)
+        self.create_button("continue", "CONTINUE")
+
+    def display_start_screen(self):
+        self.clear_buttons()
+        self.display_image(TITLE_SCREEN, 0, 0)
+        self.draw_button("start", y=176)
+        self.draw_button("resume", y=225)
+        self.draw_button("quit", y=274)
+
+        self.log_event("START SCREEN DISPLAYED")
+        self.current_screen = "start"
+        if not self.current_state and self.next_route is None:
+            self.prepare_route()  # load the first day while the player is on the title screens
+
+    def display_instructions_screen(self):
+        self.clear_buttons()
+        self.display_image("graphics/instructions.png", 0, 0)
+
+        # Defining the instructions text
+        instruction = """
+        The game begins at home, you start off with a randomised 
+        luck score(between 5 to 20). Each decision you make 
+        will have an impact that can be anything from 1 to 20!
+        Remember, this is a game of luck, so no matter how sound
+        your choice may seem, there is always a twist. 
+        Your aim is to have over 50 luck at the end of the game. 
+        Good Luck!
+        """
+
+        self.display_text(instruction, WHITE, x=20, size=17)
+        self.log_event("INSTRUCTIONS SCREEN DISPLAYED")
+        self.current_screen = "instruction"
+
+    def display_outcome(self, choice_num):
+        # the luck arithmetic lives in engine.py so the headless simulations follow the same rules
+        scenario = self.current_state.value
+        outcome_key, luck_change = resolve_outcome(scenario, choice_num, self.rng)
+        outcome = scenario.outcome_text(outcome_key)
+
+        self.luck_score += luck_change
+        if luck_change > 0:
+            self.music.cue("luck_added")
+            self.log_event("positive outcome displayed")
+        else:
+            self.music.cue("luck_dropped")
+            self.log_event("negative outcome displayed")
+        self.log_event(f"LUCK SCORE {self.luck_score}", event_type="score")
+
+        self.show_frame(("outcome", outcome), lambda: self.draw_outcome_frame(outcome))
+        self.display_text(f"Luck Score: {self.luck_score}", BLACK, x=10, y=10, size=12)
+        self.current_screen = f"outcome{scenario.scene_num}"
+
+    def display_end_screen(self):
+        self.clear_buttons()
+        self.display_image("graphics/end_screen.png", 0, 0)
+
+        self.display_text(
+            f"Your Final Luck Score is {self.luck_score}."
+            f"\n{END_MESSAGES[score_band(self.luck_score)]}",
+            BLACK,
+            WHITE,
+            y=100,
+            size=20,
+        )
+
+        self.draw_button("play_again", y=176)
+        self.draw_button("quit", y=225)
+
+        self.log_event("END SCREEN DISPLAYED")
+        self.current_screen = "end"
+
+    def show_first_frame(self) -> dict:
+        """
+        Draw and present the start screen, then log how long startup took
+
+        :return: the startup profile, see profiling.StartupProfiler.report()
+        """
+        with self.profiler.stage("first frame"):
+            self.renderer.fill((0, 0, 0))
+            self.current_screen = "start"
+            self.display_start_screen()
+            self.renderer.present()
+        report = self.profiler.report()
+        self.log_event(f"STARTUP PROFILE {report}", event_type="startup")
+        if report["over_budget"]:
+            self.log_event(f"STARTUP OVER BUDGET {report['total']}s > {report['budget']}s", event_type="startup")
+        return report
+
+    def toggle_profiler_overlay(self) -> None:
+        """Shows or hides the frame profiler's percentiles, turning the profiler on the first time."""
+        self.overlay_shown = not self.overlay_shown
+        if self.overlay_shown:
+            self.frame_profiler.enable()
+            self.update_profiler_overlay()
+        else:
+            self.renderer.clear_overlay()
+        self.log_event(f"PROFILER OVERLAY {'ON' if self.overlay_shown else 'OFF'}", event_type="profile")
+        return None
+
+    def update_profiler_overlay(self) -> None:
+        """Redraws the overlay with the latest percentiles, at most every OVERLAY_INTERVAL seconds."""
+        now = time.perf_counter()
+        if not self.overlay_shown or now - self.overlay_updated < OVERLAY_INTERVAL:
+            return None
+        self.overlay_updated = now
+        # rendered without the text cache, the numbers change every time
+        font = get_font("monospace", FONT_SIZE)
+        lines = [font.render(line, True, WHITE) for line in self.frame_profiler.overlay_lines()]
+        overlay = pygame.Surface(
+            (max(line.get_width() for line in lines) + 8, sum(line.get_height() for line in lines) + 8)
+        )
+        for i, line in enumerate(lines):
+            overlay.blit(line, (4, 4 + i * line.get_height()))
+        self.renderer.set_overlay(overlay, (4, screen_height - overlay.get_height() - 4))
+        return None
+
+    def idle_share(self) -> float:
+        """Returns the fraction of wall time since run() started that the main loop spent idle."""
+        elapsed = time.perf_counter() - self.run_started
+        # the fps delay is only known to the millisecond, so clamp the rounding error
+        return min(self.idle_seconds / elapsed, 1.0) if elapsed > 0 else 0.0
+
+    def run(self, idle=True, fps=FPS, wait_timeout=None):
+        """
+        :param idle: if True (default) the loop sleeps in pygame.event.wait until there is input and only
+                     updates the display when something was drawn. If False it polls every frame.
+        :param fps: upper limit on frames per second in both modes
+        :param wait_timeout: in idle mode, wake up after this many milliseconds even without input, for
+                             music or animations. None waits until the next event.
+
+        :return: None
+        """
+        self.show_first_frame()
+        self.run_started = time.perf_counter()
+
+        while True:
+            # frames are only composited once the loader has delivered their pictures
+            if idle and self.warmup_queue and not self.assets and not pygame.event.peek():
+                # nothing to handle, so use the time to composite an upcoming frame instead of sleeping
+                self.frame_profiler.begin_frame()
+                with self.frame_profiler.span("warm_up"):
+                    self.warm_up_step()
+                self.frame_profiler.end_frame()
+                continue
+
+            if idle:
+                wait_started = time.perf_counter()
+                event = pygame.event.wait(wait_timeout or 0)  # a timeout of 0 blocks until an event arrives
+                self.idle_seconds += time.perf_counter() - wait_started
+
+                self.frame_profiler.begin_frame()
+                events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+                with self.frame_profiler.span("events"):
+                    self.handle_events(events)
+            else:
+                self.frame_profiler.begin_frame()
+                with self.frame_profiler.span("events"):
+                    self.handle_events()
+                if self.warmup_queue and not self.assets:
+                    with self.frame_profiler.span("warm_up"):
+                        self.warm_up_step()
+            self.update_profiler_overlay()
+            with self.frame_profiler.span("present"):
+                self.renderer.present()  # pushes only the regions drawn since the last frame, if any
+            self.frame_profiler.end_frame()
+
+            self.clock.tick(fps)
+            # get_time() includes the delay added to hold the fps cap, get_rawtime() does not
+            self.idle_seconds += (self.clock.get_time() - self.clock.get_rawtime()) / 1000
+
+
+IMPORT_SECONDS = time.perf_counter() - _import_started  # importing this module and everything it imports
+
+# checks that the program runs only as an executable and not as an import
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Luckometer.")
+    parser.add_argument("--fullscreen", action="store_true", help="use the whole display at its native resolution")
+    parser.add_argument("--size", default=f"{screen_width}x{screen_height}", help="window size, e.g. 1280x720")
+    parser.add_argument("--profile-frames", metavar="FILE", help="write the timings of every frame to FILE")
+    args = parser.parse_args()
+
+    game = Game(
+        window_size=tuple(int(n) for n in args.size.lower().split("x")),
+        fullscreen=args.fullscreen,
+        profile_frames=args.profile_frames,
+    )
+    game.run()
@@ -0,0 +1,192 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+"""
+This is the Profiling Module
+The StartupProfiler class times the stages of starting the game, so the time to the first frame can be held
+to a budget. Each stage is timed with perf_counter inside a `with profiler.stage(name):` block, and stages
+that happened before the profiler existed, like importing the game's modules, can be added with add().
+
+Game records these stages and logs the report as STARTUP PROFILE once the first frame has been shown:
+- import: importing game.py and the modules it imports, pygame included
+- pygame init: starting the display and font subsystems and opening the window
+- font discovery: finding and opening the first font
+- asset loading: opening the texture atlas and the caches
+- first frame: drawing and presenting the start screen
+
+Example:
+profiler = StartupProfiler(budget=0.5)
+with profiler.stage("pygame init"):
+    pygame.display.init()
+print(profiler.report())  # {"stages": {"pygame init": 0.012}, "total": 0.012, "budget": 0.5, ...}
+"""
+
+STARTUP_BUDGET = 0.5  # seconds from the start of the import to the first frame on screen
+
+
+class StartupProfiler:
+    def __init__(self, budget=STARTUP_BUDGET):
+        """
+        Args:
+        -budget: The longest startup should take, in seconds. None for no budget.
+        """
+        self.budget = budget
+        self.stages = {}  # stage name -> seconds, in the order the stages ran
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times the body of a with block as the stage name. A stage timed twice adds up."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Records a stage timed elsewhere."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        return None
+
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.total() > self.budget
+
+    def report(self) -> dict:
+        """Returns the stage times and the total in seconds, rounded to the millisecond."""
+        return {
+            "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            "total": round(self.total(), 3),
+            "budget": self.budget,
+            "over_budget": self.over_budget(),
+        }
+
+
+"""
+The FrameProfiler class times the work done in each frame of the main loop, split into named spans such as
+"events", "image", "text" and "present", and keeps the last FRAME_WINDOW frames to give rolling p50, p95 and
+p99 frame and span times. Spans can nest: the time in "text" inside "events" counts towards both. A frame is
+the work between two waits for input, so the time spent waiting or holding the fps cap is not included.
+
+It is off by default and then span() returns one shared do-nothing context manager, so an instrumented call
+costs a method call and a with statement. When it is on, every frame can also be written to a JSON Lines file,
+one line per frame with its total and its spans in milliseconds.
+
+Example:
+profiler = FrameProfiler()
+profiler.enable("frames.jsonl")
+profiler.begin_frame()
+with profiler.span("events"):
+    handle_events()
+profiler.end_frame()
+print(profiler.percentiles())  # {"frame": {"p50": 0.41, "p95": 0.9, "p99": 1.3, "max": 1.3}, "events": {...}}
+"""
+
+FRAME_WINDOW = 600  # frames kept for the percentiles, ten seconds of polling at 60 fps
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("spans", "name", "started")
+
+    def __init__(self, spans: dict, name: str):
+        self.spans = spans
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.spans[self.name] = self.spans.get(self.name, 0.0) + time.perf_counter() - self.started
+        return False
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Returns the nearest-rank p-th percentile of a sorted, non-empty list."""
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+class FrameProfiler:
+    def __init__(self, window=FRAME_WINDOW):
+        """
+        Args:
+        -window: The number of most recent frames the percentiles are taken over
+        """
+        self.enabled = False
+        self.samples = deque(maxlen=window)  # (frame seconds, {span name: seconds}) of the latest frames
+        self.frames = 0
+        self._spans = {}  # span name -> seconds, of the frame in progress
+        self._frame_started = None
+        self._export = None  # open JSON Lines file the frames are written to, if any
+
+    def enable(self, export_path=None) -> None:
+        """Starts profiling, writing every frame to export_path if it is given."""
+        self.enabled = True
+        if export_path and self._export is None:
+            self._export = open(export_path, "a", encoding="utf-8")
+        return None
+
+    def disable(self) -> None:
+        """Stops profiling. The frames already recorded are kept."""
+        self.enabled = False
+        self._frame_started = None
+        return None
+
+    def span(self, name: str):
+        """Returns a context manager that adds the time spent in its with block to the span called name."""
+        if not self.enabled or self._frame_started is None:
+            return _NO_SPAN
+        return _Span(self._spans, name)
+
+    def begin_frame(self) -> None:
+        if self.enabled:
+            self._frame_started = time.perf_counter()
+            self._spans = {}
+        return None
+
+    def end_frame(self) -> None:
+        if self._frame_started is None:
+            return None
+        seconds = time.perf_counter() - self._frame_started
+        self._frame_started = None
+        self.samples.append((seconds, self._spans))
+        self.frames += 1
+        if self._export is not None:
+            spans = {name: round(value * 1000, 3) for name, value in self._spans.items()}
+            self._export.write(json.dumps({"frame": self.frames, "ms": round(seconds * 1000, 3), "spans": spans}) + "\n")
+        return None
+
+    def percentiles(self) -> dict:
+        """Returns p50, p95, p99 and max in milliseconds of the frames and of every span, over the window."""
+        series = {"frame": [seconds for seconds, _ in self.samples]}
+        for _, spans in self.samples:
+            for name, seconds in spans.items():
+                series.setdefault(name, []).append(seconds)
+        result = {}
+        for name, values in series.items():
+            if not values:
+                continue
+            values.sort()
+            result[name] = {
+                f"p{p}": round(percentile(values, p) * 1000, 3) for p in (50, 95, 99)
+            }
+            result[name]["max"] = round(values[-1] * 1000, 3)
+        return result
+
+    def overlay_lines(self) -> list:
+        """Returns the percentiles as short lines of text for the on-screen overlay."""
+        lines = [f"{len(self.samples)} frames   p50 / p95 / p99 ms"]
+        for name, stats in self.percentiles().items():
+            lines.append(f"{name:<8} {stats['p50']:7.2f} {stats['p95']:7.2f} {stats['p99']:7.2f}")
+        return lines
+
+    def close(self) -> None:
+        """Closes the export file."""
+        if self._export is not None:
+            self._export.close()
+            self._export = None
+        return None
@@ -0,0 +1,308 @@
+import math
+
+import pygame
+
+from assets import SurfaceCache
+
+"""
+This is the Dirty Rectangle Renderer Module
+Most screen changes in the game only touch a small part of the window: going from a scenario to its outcome
+replaces the caption, the picture and the buttons, and leaves the white background alone. Flipping the
+whole 600x400 framebuffer for that wastes most of the copy.
+
+The DirtyRectRenderer class wraps the screen surface. Every fill and blit goes through it, so it knows which
+rectangles changed since the last frame, and present() pushes only those with pygame.display.update(rects).
+Filling the screen with the same colour it was last filled with only dirties what was drawn on top of that
+background since then; a different colour dirties the whole screen.
+
+It also counts the pixels pushed to the display so the saving over a full flip can be measured.
+
+Positions and surfaces given to the renderer are in logical coordinates, the 600x400 layout the game is
+designed for, whatever the size of the window. The logical screen is scaled by the same factor in both
+directions to the largest viewport that fits the window, centred, with black bars on the sides that are left
+over. A surface blitted with a key, such as a picture's path or a frame's key, is scaled once for the current
+window size and kept in a SurfaceCache under that key, so showing the same picture, text or pre-composited
+frame again is a plain blit. The cache holds a few viewports' worth of pixels, and keys rather than the
+surfaces themselves, so it never keeps a surface alive after the game's own caches have let it go. resize()
+empties that cache and redraws the current screen at the new size from the surfaces drawn on it since the
+last fill.
+
+Pre-composited frames are shown with blit_frame(), which is told the background colour of the frame and the
+rectangles drawn over it. The whole frame is copied to the screen, but when the screen shows the same
+background only those rectangles and what the previous screen drew are pushed, as if the frame had been drawn
+element by element.
+
+An overlay, such as the frame profiler's, can be put on top of everything with set_overlay(). It is drawn by
+present() after the rest of the frame, so it never becomes part of the screen being tracked and goes away
+cleanly with clear_overlay(). When it is replaced by a smaller one, the area the old one covered is drawn again
+from the display list first.
+
+Example:
+renderer = DirtyRectRenderer(screen, logical_size=(600, 400))
+renderer.fill("white")
+renderer.blit(text_surface, (10, 10), key=("text", "Luck Score: 10"))
+renderer.present()  # updates only the text's rectangle plus whatever the previous screen drew
+print(renderer.stats())
+"""
+
+SCALED_CACHE_SCREENS = 4  # scaled surfaces kept, measured in full viewports
+
+
+def merge_rects(rects) -> list:
+    """
+    Merge overlapping rectangles so that no pixel is pushed or counted twice
+
+    Args:
+    -rects: A list of pygame.Rect
+
+    Returns:
+    -merged: A list of pairwise non-overlapping pygame.Rect covering every input rectangle
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:  # keep absorbing until the grown rectangle overlaps nothing else
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRectRenderer:
+    def __init__(self, screen, logical_size=None):
+        """
+        Args:
+        -screen: The surface drawn on, usually the display surface
+        -logical_size: The (width, height) of the layout, defaults to the size of screen
+        """
+        self.logical_size = logical_size or screen.get_size()
+        self.scaled_cache = SurfaceCache()  # key given to blit() -> its surface at the current scale
+        self.dirty = []  # rectangles changed since the last present()
+        # (surface, logical position, screen rectangle, key) drawn on top of the background since the last fill()
+        self.drawn = []
+        self.changed = []  # screen rectangles that differ from the background, what the next screen has to push
+        self.background = None  # colour of the last fill(), None if it was painted over by a full-screen blit
+        self.frames = 0
+        self.pixels_pushed = 0
+        self.last_frame_pixels = 0
+        self.overlay = None  # (surface, logical position) drawn over every frame by present()
+        self.overlay_changed = False
+        self.overlay_rect = None  # screen area the overlay was last drawn on
+        self.set_screen(screen)
+
+    def set_screen(self, screen) -> None:
+        """Works out the scale and the viewport for screen's size. Scaled surfaces from another size are dropped."""
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        width, height = self.logical_size
+        self.scale = min(self.screen_rect.width / width, self.screen_rect.height / height)
+        self.viewport = pygame.Rect(0, 0, round(width * self.scale), round(height * self.scale))
+        self.viewport.center = self.screen_rect.center
+        self.overlay_rect = None
+        self.scaled_cache.clear()
+        self.scaled_cache.max_bytes = SCALED_CACHE_SCREENS * self.viewport.width * self.viewport.height * 4
+        return None
+
+    def to_screen(self, position) -> tuple:
+        """Converts a logical position to a position on the screen."""
+        x, y = position
+        return self.viewport.x + round(x * self.scale), self.viewport.y + round(y * self.scale)
+
+    def to_logical(self, position) -> tuple:
+        """Converts a position on the screen, e.g. of a mouse event, to a logical position."""
+        x, y = position
+        return (x - self.viewport.x) / self.scale, (y - self.viewport.y) / self.scale
+
+    def scaled(self, surface, key=None):
+        """Returns surface at the current scale. With a key, it is scaled only the first time at this size."""
+        if self.scale == 1 or not surface.get_width() or not surface.get_height():
+            return surface  # an empty surface, e.g. a blank line of text, crashes smoothscale
+        if key is None:
+            return self._scale(surface)
+        return self.scaled_cache.get(key, lambda: self._scale(surface))
+
+    def prescale(self, surface, key) -> bool:
+        """
+        Scale surface for the current window ahead of time, if it fits in the cache without evicting anything
+
+        Returns:
+        -scaled: True if the surface was scaled and cached
+        """
+        if self.scale == 1 or key in self.scaled_cache:
+            return False
+        width, height = surface.get_size()
+        size = round(width * self.scale) * round(height * self.scale) * 4
+        if self.scaled_cache.current_bytes + size > self.scaled_cache.max_bytes:
+            return False
+        self.scaled(surface, key)
+        return True
+
+    def _scale(self, surface):
+        source = surface if surface.get_bitsize() >= 24 else surface.convert()  # smoothscale needs 24 or 32 bits
+        width, height = source.get_size()
+        size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+        return pygame.transform.smoothscale(source, size)
+
+    def fill(self, color) -> None:
+        color = pygame.Color(color)
+        if color == self.background:
+            # only what was drawn over the background goes back to it
+            self.dirty.extend(self.changed)
+        else:
+            self.dirty.append(self.viewport)
+        self.screen.fill(color, self.viewport)
+        self.background = color
+        self.drawn = []
+        self.changed = []
+        return None
+
+    def blit(self, surface, position, key=None):
+        """
+        Blits surface at a logical position and records the screen area it covered. Returns that area.
+        key names the surface in the cache of scaled surfaces; without one it is scaled again every time.
+        """
+        rect = self.screen.blit(self.scaled(surface, key), self.to_screen(position))
+        if rect.contains(self.viewport):  # a full-screen image replaces the background
+            self.background = None
+            self.drawn = []
+            self.changed = []
+        self.dirty.append(rect)
+        self.drawn.append((surface, position, rect, key))
+        self.changed.append(rect)
+        return rect
+
+    def overdraw(self, surface, position, key=None):
+        """
+        Blits surface over something already drawn at the same place, such as a button's hover image over the
+        button, and marks the area dirty without adding to the display list. The area is already in it, so the
+        next screen clears it, and a redraw() shows what was drawn there first. Returns the area.
+        """
+        rect = self.screen.blit(self.scaled(surface, key), self.to_screen(position))
+        self.dirty.append(rect)
+        return rect
+
+    def blit_frame(self, frame, background, regions, key=None) -> None:
+        """
+        Show a pre-composited full-screen frame
+
+        Args:
+        -frame: The frame, at the logical size
+        -background: The colour the frame was filled with, None if it has no plain background
+        -regions: The logical rectangles drawn over the background in the frame
+        -key: Names the frame in the cache of scaled surfaces
+        """
+        rect = self.screen.blit(self.scaled(frame, key), self.viewport)
+        color = pygame.Color(background) if background is not None else None
+        if color is not None and color == self.background:
+            # the rest of the frame is the background already on the screen
+            self.dirty.extend(self.changed)
+            self.dirty.extend(self.to_screen_rect(region) for region in regions)
+        else:
+            self.dirty.append(rect)
+        self.changed = [self.to_screen_rect(region) for region in regions] if color is not None else [rect]
+        self.background = color
+        self.drawn = [(frame, (0, 0), rect, key)]
+        return None
+
+    def to_screen_rect(self, rect):
+        """Converts a logical rectangle to the screen rectangle it covers once scaled, clipped to the viewport."""
+        left, top = self.to_screen(rect.topleft)
+        right, bottom = self.to_screen(rect.bottomright)
+        screen_rect = pygame.Rect(left, top, right - left, bottom - top)
+        if self.scale != 1:  # smoothscale blends each edge with its neighbours
+            margin = math.ceil(self.scale)
+            screen_rect.inflate_ip(2 * margin, 2 * margin)
+        return screen_rect.clip(self.viewport)
+
+    def resize(self, screen) -> None:
+        """Switches to a screen of another size and redraws what is on the current screen at the new scale."""
+        self.set_screen(screen)
+        self.redraw()
+        return None
+
+    def redraw(self) -> None:
+        """Draws the current screen again from the surfaces drawn on it since the last fill."""
+        background, drawn = self.background, self.drawn
+        self.screen.fill((0, 0, 0))  # the bars around the viewport
+        self.dirty = [self.screen_rect]
+        self.background, self.drawn, self.changed = None, [], []
+        if background is not None:
+            self.fill(background)
+        for surface, position, _, key in drawn:
+            self.blit(surface, position, key)
+        self.overlay_rect = None
+        return None
+
+    def restore(self, rect) -> None:
+        """Draws the display list again inside a screen rectangle, e.g. where an overlay used to be."""
+        self.screen.set_clip(rect)
+        self.screen.fill((0, 0, 0))  # the bars around the viewport
+        if self.background is not None:
+            self.screen.fill(self.background, self.viewport)
+        for surface, position, drawn_rect, key in self.drawn:
+            if drawn_rect.colliderect(rect):
+                self.screen.blit(self.scaled(surface, key), self.to_screen(position))
+        self.screen.set_clip(None)
+        self.dirty.append(rect)
+        return None
+
+    def invalidate(self) -> None:
+        """Marks the whole screen as changed, e.g. after the window was uncovered."""
+        self.dirty.append(self.screen_rect)
+        return None
+
+    def set_overlay(self, surface, position) -> None:
+        """Shows surface at a logical position on top of every frame, replacing the previous overlay."""
+        self.overlay = (surface, position)
+        self.overlay_changed = True
+        return None
+
+    def clear_overlay(self) -> None:
+        """Removes the overlay and redraws what was under it."""
+        if self.overlay is not None:
+            self.overlay = None
+            self.redraw()
+        return None
+
+    def present(self) -> bool:
+        """
+        Push the changed regions to the display
+
+        Returns:
+        -changed: False if nothing was drawn since the last call and the display was left alone
+        """
+        if not self.dirty and not self.overlay_changed:
+            return False
+
+        if self.overlay_changed and self.overlay_rect is not None:
+            self.restore(self.overlay_rect)  # the new overlay may not cover all of the old one
+            self.overlay_rect = None
+        self.overlay_changed = False
+        if self.overlay is not None:
+            surface, position = self.overlay
+            # overlays change every time they are set, so they are scaled without filling the cache
+            scaled = surface if self.scale == 1 else self._scale(surface)
+            self.overlay_rect = self.screen.blit(scaled, self.to_screen(position))
+            self.dirty.append(self.overlay_rect)
+
+        rects = [rect.clip(self.screen_rect) for rect in merge_rects(self.dirty)]
+        pygame.display.update(rects)
+
+        self.last_frame_pixels = sum(rect.width * rect.height for rect in rects)
+        self.pixels_pushed += self.last_frame_pixels
+        self.frames += 1
+        self.dirty = []
+        return True
+
+    def stats(self) -> dict:
+        """Returns the pixel counters and how they compare to flipping the full screen every frame."""
+        full_frame = self.screen_rect.width * self.screen_rect.height
+        return {
+            "frames": self.frames,
+            "pixels_pushed": self.pixels_pushed,
+            "last_frame_pixels": self.last_frame_pixels,
+            "pixels_per_frame": self.pixels_pushed / self.frames if self.frames else 0,
+            "full_flip_share": self.pixels_pushed / (full_frame * self.frames) if self.frames else 0,
+            "scale": round(self.scale, 3),
+        }
@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import re
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # replays need no window or sound
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # keep stdout machine-readable
+import pygame  # noqa: E402
+
+from game import Game, event_type_of  # noqa: E402
+
+"""
+This is the Replay Module
+It reads an event log written by the game and plays it again headless, as fast as the game can draw: every
+click and key press in the log is fed straight to Game.handle_events() without the main loop, so nothing
+waits for input or for clock.tick(). What the replayed game logs is then checked against the original, which
+turns any player's log into a regression test and a profile of a real trace.
+
+Both log formats are read: the JSON Lines written by eventlog.EventLogger, where each run of the game is the
+set of records sharing a session id, and the older plain text format ("3.333s: START BUTTON CLICKED"), where
+the whole file is one run.
+
+Every session of the game logs "SESSION SEED n" and the replay gives those seeds back to the game, so the
+route, the luck differences, the outcomes and the luck scores must come out the same. Logs from before the
+seeds were recorded can only be checked for the screens shown: outcomes are compared without whether they were
+positive or negative, and scores are not compared.
+
+Example:
+python replay.py help/luckometer.log
+python replay.py luckometer.log --repeat 100  # profile the replay of every run in the log
+"""
+
+TEXT_LINE = re.compile(r"^\s*([\d.]+)s: (.*?)\s*$")
+CHOICE_CLICKED = re.compile(r"^(s\d+_choice\d+) CLICKED$")
+SESSION_SEED = re.compile(r"^SESSION SEED (\d+)$")
+CHECKED_TYPES = ("screen", "score")  # what the replayed game logs is compared on these types of event
+
+# logged event -> the input that caused it, a button to click or a key to press
+INPUTS = {
+    "START BUTTON CLICKED": ("click", "start"),
+    "RESUME BUTTON CLICKED": ("click", "resume"),
+    "HOME BUTTON CLICKED": ("click", "home"),
+    "CONTINUE CLICKED": ("click", "continue"),
+    "PLAY AGAIN BUTTON CLICKED": ("click", "play_again"),
+    "SPACEBAR PRESSED": ("key", pygame.K_SPACE),
+}
+QUIT_EVENTS = ("QUIT CLICKED", "QUIT BUTTON CLICKED")
+
+
+def read_log(path: str) -> list:
+    """
+    Read an event log in either format
+
+    Args:
+    -path: The log file
+
+    Returns:
+    -runs: A list with one list of records per run of the game, each record a dictionary with at least
+     "elapsed", "event" and "type"
+    """
+    runs = {}  # session id of the run -> records, in the order the runs start
+    with open(path, encoding="utf-8") as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            if line.lstrip().startswith("{"):
+                record = json.loads(line)
+                record.setdefault("type", event_type_of(record["event"]))
+            else:
+                match = TEXT_LINE.match(line)
+                if match is None:
+                    continue
+                elapsed, event = match.groups()
+                record = {"elapsed": float(elapsed), "event": event, "type": event_type_of(event), "session": ""}
+            runs.setdefault(record.get("session", ""), []).append(record)
+    return list(runs.values())
+
+
+def input_for(event: str):
+    """Returns the input behind a logged event: ("click", button name), ("key", key), "quit" or None."""
+    if event in QUIT_EVENTS:
+        return "quit"
+    match = CHOICE_CLICKED.match(event)
+    if match:
+        return "click", match.group(1)
+    return INPUTS.get(event)
+
+
+class TraceRecorder:
+    """Takes the place of the game's EventLogger during a replay and keeps the records in memory."""
+
+    def __init__(self):
+        self.records = []
+
+    def log(self, event: str, elapsed: float, screen="", event_type="info") -> None:
+        self.records.append({"elapsed": elapsed, "event": event, "screen": screen, "type": event_type})
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def checked_events(records, seeded: bool) -> list:
+    """Returns the events a replay must reproduce. Without seeds, only which screens were shown can be checked."""
+    events = []
+    for record in records:
+        if record["type"] not in CHECKED_TYPES:
+            continue
+        event = record["event"]
+        if not seeded:
+            if record["type"] == "score":
+                continue
+            event = event.replace("positive outcome", "outcome").replace("negative outcome", "outcome")
+        events.append(event)
+    return events
+
+
+def replay(records) -> dict:
+    """
+    Replay one run of the game and compare it with its log
+
+    Args:
+    -records: The records of one run, as returned by read_log()
+
+    Returns:
+    -result: The number of inputs replayed and events checked, the mismatches, the time the replay took and
+     how many times faster than the original it ran
+    """
+    seeds = [int(match.group(1)) for match in (SESSION_SEED.match(r["event"]) for r in records) if match]
+    recorder = TraceRecorder()
+    started = time.perf_counter()
+    game = Game(log_to_stdout=False, seeds=seeds, logger=recorder)
+    game.show_first_frame()
+
+    expected_records = []
+    inputs = 0
+    problem = None
+    try:
+        for record in records:
+            action = input_for(record["event"])
+            if action == "quit":
+                break
+            expected_records.append(record)
+            if action is None:
+                continue
+
+            kind, value = action
+            if kind == "key":
+                game.handle_events([pygame.event.Event(pygame.KEYDOWN, key=value)])
+            else:
+                rect = game.hit_index.rects.get(value)
+                if rect is None:
+                    problem = f"{record['event']} at {record['elapsed']}s: no {value} button on {game.current_screen}"
+                    break
+                position = game.renderer.to_screen(rect.center)
+                game.handle_events(
+                    [
+                        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=position, button=1),
+                        pygame.event.Event(pygame.MOUSEBUTTONUP, pos=position, button=1),
+                    ]
+                )
+            game.renderer.present()
+            inputs += 1
+    finally:
+        game.assets.close()
+    seconds = time.perf_counter() - started
+
+    expected = checked_events(expected_records, bool(seeds))
+    actual = checked_events(recorder.records, bool(seeds))
+    mismatches = [
+        {"index": i, "expected": want, "actual": got}
+        for i, (want, got) in enumerate(zip(expected, actual))
+        if want != got
+    ]
+    if len(expected) != len(actual):
+        mismatches.append({"index": min(len(expected), len(actual)), "expected": len(expected), "actual": len(actual)})
+    if problem:
+        mismatches.append({"index": None, "expected": problem, "actual": None})
+
+    recorded_seconds = expected_records[-1]["elapsed"] if expected_records else 0.0
+    return {
+        "inputs": inputs,
+        "checked": len(expected),
+        "seeded": bool(seeds),
+        "mismatches": mismatches,
+        "seconds": round(seconds, 4),
+        "speedup": round(recorded_seconds / seconds, 1) if seconds else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay an event log headless and check the game still matches it.")
+    parser.add_argument("log", help="luckometer.log, in the JSON Lines or the older text format")
+    parser.add_argument("--repeat", type=int, default=1, help="replay every run this many times, for profiling")
+    args = parser.parse_args()
+
+    failed = False
+    for number, run in enumerate(read_log(args.log)):
+        for _ in range(args.repeat):
+            result = replay(run)
+        failed = failed or bool(result["mismatches"])
+        print(json.dumps({"run": number, **result}))
+    pygame.quit()
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,523 @@
+import json
+import os
+import random
+import sys
+from array import array
+
+
+"""
+This is the Game Scenarios Linked List Module
+This module implements a linked list data structure to store and manipulate game scenarios.
+The ListNode class represents a single node in the linked list, with attributes for the node's value and the next node in the list.
+The LinkedList class represents the linked list itself, with methods for appending nodes, converting the linked list data structure to a Python list data type, and a utility functions to get the final scenarios.
+It keeps a pointer to its last node so appending is O(1), and supports len() and iteration with a for loop.
+The nodes use __slots__ instead of a per-instance __dict__, which keeps every game session small when many are held at once.
+The get_game_scenarios function takes a list of game scenarios, shuffles the list randomly, and returns a linked list of the scenarios.
+
+Example:
+print(get_game_scenarios(["scenario1", "scenario2", "scenario3", "scenario4"]).to_list())
+
+Note:
+This module is designed to handle errors and exceptions, and provides informative error messages to help with debugging.
+"""
+
+
+class ListNode:
+    __slots__ = ("value", "next")
+
+    # Constructor to initialize the node object
+    def __init__(self, value, next=None):
+        """
+        Assign data to a node. In our project it will be the game scenario
+
+        Args:
+        -value: The value of the node
+        -next: The next node in the linked list
+
+        Returns:
+        None
+        """
+        try:
+            self.value = value
+            # Initialize next as null
+            self.next = next
+        except Exception as e:
+            print(
+                "An error occured while creating a node, please check the input values!",
+                e,
+            )
+
+
+class LinkedList:
+    def __init__(self):
+        """
+        Initialize the head of the linked list
+        """
+        try:
+            self.head = None
+            self.tail = None  # last node, so append does not have to walk the list
+            self.length = 0
+        except Exception as e:
+            print("An error occured. No parameter needed!", e)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield current.value
+            current = current.next
+
+    def append(self, value):
+        """
+        Create a new node and append it at the end of the linked list
+
+        Args:
+        -value: The value of the node to be appended, here it will be the game scenario
+
+        Returns:
+        None
+        """
+        try:
+            new_node = ListNode(value)
+            if not self.head:
+                self.head = new_node
+            else:
+                self.tail.next = new_node
+            self.tail = new_node
+            self.length += 1
+        except Exception as e:
+            print(
+                "An error occured while appending a node, please check the input values!",
+                e,
+            )
+
+    def to_list(self):
+        """
+        Convert the linked list to a list
+
+        Args:
+        None
+
+        Returns:
+        -elements: A list of the elements in the linked list
+        """
+        try:
+            return list(self)
+        except Exception as e:
+            print(
+                "An error occured while converting the linked list to a list, please check the input values!",
+                e,
+            )
+
+
+"""
+The following class represents a scenario in the game. Scenario is basically an occurence in the "day" of this game.
+
+Each scenario has a unique number, an associated image for context, and a set of choices with possible outcomes.
+The luck difference attribute represents a random value that can affect the outcome of the scenario. It is drawn
+from luck_range when the scenario is created and again by `draw_luck_diff()` at the start of every session.
+
+The `set_cases()` method allows setting the caption, choices, and outcomes for the scenario.
+The `outcome_text()` method returns an outcome followed by the luck it adds or takes away, e.g. "You get lost.\n\nLuck -7".
+The `__str__()`  method returns a string representation of the scenario, including its number.
+
+Example:
+    scenario1 = Scenario(1, "path/to/image.jpg")
+    scenario1.set_cases(
+        "You are at a fork in the road.",
+        "Go left",
+        "You find a treasure!",
+        "You get lost.",
+        "Go right",
+        "You find a friend!",
+        "You get hurt.",
+    )
+    print(scenario1)  # Output: scenario1
+"""
+
+
+LUCK_DIFF_RANGE = (1, 20)
+
+
+class Scenario:
+    __slots__ = ("picture_path", "cases", "scene_num", "luck_range", "luck_diff", "caption")
+
+    def __init__(self, scene_num, picture_path: str, luck_range=LUCK_DIFF_RANGE):
+        self.picture_path = picture_path
+        self.cases = {}
+        self.scene_num = scene_num
+        self.luck_range = luck_range
+        self.draw_luck_diff()
+
+    def draw_luck_diff(self, rng=random) -> None:
+        """Draws a new luck difference for this scenario, called at the start of every session."""
+        self.luck_diff = rng.randint(*self.luck_range)
+        return None
+
+    def outcome_text(self, outcome_key: str, luck_diff=None) -> str:
+        """
+        Returns the text of an outcome, e.g. 'neg_outcome2', with the luck it changes on the last line.
+        luck_diff defaults to the scenario's own, a session holding its own luck differences passes it in.
+        """
+        sign = "+" if outcome_key.startswith("pos") else "-"
+        return f"{self.cases[outcome_key]}\n\nLuck {sign}{self.luck_diff if luck_diff is None else luck_diff}"
+
+    def set_cases(
+        self,
+        caption: str,
+        choice1: str,
+        pos_outcome1: str,
+        neg_outcome1: str,
+        choice2: str,
+        pos_outcome2: str,
+        neg_outcome2: str,
+    ) -> None:
+        """Must be two cases"""
+
+        # interned, so sessions and copies of the same text all share one string object
+        caption, choice1, pos_outcome1, neg_outcome1, choice2, pos_outcome2, neg_outcome2 = map(
+            sys.intern, (caption, choice1, pos_outcome1, neg_outcome1, choice2, pos_outcome2, neg_outcome2)
+        )
+        self.caption = caption
+
+        # Case 1
+        self.cases["choice1"] = ["pos_outcome1", "pos_outcome2"]
+
+        self.cases["choice1"] = choice1
+        self.cases["pos_outcome1"] = pos_outcome1
+        self.cases["neg_outcome1"] = neg_outcome1
+
+        # Case 2
+        self.cases["choice2"] = choice2
+        self.cases["pos_outcome2"] = pos_outcome2
+        self.cases["neg_outcome2"] = neg_outcome2
+
+        return None
+
+    def __str__(self):
+        output_string = f"scenario{self.scene_num}"
+
+        return output_string
+
+
+"""
+The tree and encapsulates every scenario that exists in the game.
+The get_path() method will randomise scenarios to be put in the list to be used in the game
+"""
+
+
+class TreeNode:
+    __slots__ = ("data", "left", "right")
+
+    def __init__(self, data):
+        self.data = data
+        self.left = None
+        self.right = None
+
+
+"""
+This is the Scenario Catalog Module
+The scenarios, their pictures and the edges of the tree are kept in data/scenarios.jsonl, one JSON object per
+line, instead of being built in code when the module is imported. Outcome texts are stored without the
+"Luck +N" line, because luck_diff is drawn again for every session and the line is added when the outcome
+is shown.
+
+Next to the catalog is a compact index, data/scenarios.jsonl.idx, holding the byte offset and length of
+every record and the ids of its children. Opening the catalog reads only the index, so the tree can be
+walked without parsing any scenario, and a scenario is read from disk the first time its node's data is
+used. If the catalog has been edited and the index no longer matches, the index is rebuilt automatically.
+
+Example:
+catalog = ScenarioCatalog()
+root = catalog.tree()
+path = get_path(root)  # loads only the scenarios on the sampled route
+"""
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "scenarios.jsonl")
+
+
+class ScenarioCatalog:
+    def __init__(self, path=CATALOG_PATH):
+        """
+        Open a catalog by reading its index, building the index first if it is missing or out of date
+
+        Args:
+        -path: The catalog file
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self._scenarios = {}  # scenario id -> Scenario, filled in as scenarios are loaded
+        self._nodes = {}  # scenario id -> LazyTreeNode, so every id has exactly one node
+        self._load_index()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, encoding="utf-8") as index_file:
+                index = json.load(index_file)
+            if index["catalog_size"] != os.path.getsize(self.path):
+                raise ValueError("catalog changed since the index was built")
+            self.root_id = index["root"]
+            self._index = {entry[0]: tuple(entry[1:]) for entry in index["entries"]}
+        except (OSError, ValueError, KeyError):
+            self.build_index()
+        return None
+
+    def build_index(self) -> None:
+        """
+        Scan the catalog and write its index. Each entry is [id, offset, length, left child id, right child id]
+        with None for a missing child. The first record in the catalog is the root of the tree.
+        """
+        entries = []
+        offset = 0
+        with open(self.path, "rb") as catalog_file:
+            for line in catalog_file:
+                if line.strip():
+                    record = json.loads(line)
+                    children = (record.get("children", []) + [None, None])[:2]
+                    entries.append([record["id"], offset, len(line)] + children)
+                offset += len(line)
+
+        self.root_id = entries[0][0]
+        self._index = {entry[0]: tuple(entry[1:]) for entry in entries}
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as index_file:
+                json.dump({"catalog_size": offset, "root": self.root_id, "entries": entries}, index_file)
+        except OSError:  # a read-only install still works, it just rebuilds the index every time
+            pass
+        return None
+
+    def _read_record(self, scenario_id) -> dict:
+        offset, length = self._index[scenario_id][:2]
+        with open(self.path, "rb") as catalog_file:
+            catalog_file.seek(offset)
+            record = json.loads(catalog_file.read(length))
+        if record["id"] != scenario_id:  # the catalog was edited without changing its size
+            self.build_index()
+            return self._read_record(scenario_id)
+        return record
+
+    def scenario(self, scenario_id) -> Scenario:
+        """Returns the Scenario with this id, reading it from the catalog the first time."""
+        scenario = self._scenarios.get(scenario_id)
+        if scenario is None:
+            record = self._read_record(scenario_id)
+            scenario = Scenario(record["layer"], record["picture"], tuple(record.get("luck_range", LUCK_DIFF_RANGE)))
+            first, second = record["choices"]
+            scenario.set_cases(
+                record["caption"],
+                first["text"],
+                first["positive"],
+                first["negative"],
+                second["text"],
+                second["positive"],
+                second["negative"],
+            )
+            self._scenarios[scenario_id] = scenario
+        return scenario
+
+    def node(self, scenario_id):
+        """Returns the tree node for a scenario id without loading the scenario, or None for None."""
+        if scenario_id is None:
+            return None
+        node = self._nodes.get(scenario_id)
+        if node is None:
+            node = self._nodes[scenario_id] = LazyTreeNode(self, scenario_id)
+        return node
+
+    def children(self, scenario_id):
+        """Returns the (left, right) child ids of a scenario from the index, None where there is no child."""
+        return self._index[scenario_id][2:4]
+
+    def tree(self):
+        """Returns the root node of the scenario tree."""
+        return self.node(self.root_id)
+
+
+class LazyTreeNode(TreeNode):
+    """A TreeNode whose scenario is only read from the catalog when .data is used."""
+
+    __slots__ = ("catalog", "scenario_id")
+
+    def __init__(self, catalog: ScenarioCatalog, scenario_id):
+        self.catalog = catalog
+        self.scenario_id = scenario_id
+
+    # pickled by hand because the default for __slots__ would also try to save and restore the properties
+    def __getstate__(self):
+        return self.catalog, self.scenario_id
+
+    def __setstate__(self, state):
+        self.catalog, self.scenario_id = state
+
+    @property
+    def data(self):
+        return self.catalog.scenario(self.scenario_id)
+
+    @property
+    def left(self):
+        return self.catalog.node(self.catalog.children(self.scenario_id)[0])
+
+    @property
+    def right(self):
+        return self.catalog.node(self.catalog.children(self.scenario_id)[1])
+
+
+def get_path(root, rng=random):
+    # walks down the tree in a loop rather than recursively, so deep trees neither copy the path at every
+    # level nor hit the recursion limit
+    path = []
+    node = root
+    while node is not None:
+        path.append(node.data)
+        if node.left is None and node.right is None:
+            break
+        node = node.left if rng.choice([True, False]) else node.right
+    return path
+
+
+"""
+The ArrayTree class stores the scenario tree in a flat list numbered breadth first: the root is slot 0, and the
+children of slot i are children[2i] and children[2i + 1] in one array of slot numbers, -1 where a branch is
+empty. Only existing nodes get a slot, so a deep but sparse tree, such as a long ladder of scenarios, costs as
+little as its number of scenarios rather than 2 ** depth.
+
+A path is walked with one random bit per layer, taken from a single getrandbits() call, and sample_paths()
+writes the slot numbers of K paths into one preallocated array, which makes generating routes for many
+sessions cheap even for days with 20 or more decision layers.
+
+Example:
+tree = ArrayTree.from_root(root)
+scenarios = tree.sample_path()  # same as get_path(root)
+slots = tree.sample_paths(1000)  # 1000 routes, tree.depth slots each, -1 after a route ends
+"""
+
+
+class ArrayTree:
+    def __init__(self, slots: list, children, depth: int):
+        """
+        Args:
+        -slots: The tree nodes, numbered breadth first
+        -children: children[2i + bit] is the slot of the left (bit 0) or right (bit 1) child of slot i, or -1
+        -depth: The number of layers, the longest a path can be
+        """
+        self.slots = slots
+        self.children = children
+        self.depth = depth
+
+    @classmethod
+    def from_root(cls, root):
+        """
+        Number the nodes of a pointer-linked tree breadth first. Only the tree's shape is read, so lazily loaded
+        scenarios stay unloaded.
+        """
+        slots = []
+        children = array("l")
+        depth = 0
+        layer = [root] if root is not None else []
+        while layer:
+            depth += 1
+            next_layer = []
+            first_child = len(slots) + len(layer)  # the slot the next layer starts at
+            for node in layer:
+                slots.append(node)
+                for child in (node.left, node.right):
+                    if child is None:
+                        children.append(-1)
+                    else:
+                        children.append(first_child + len(next_layer))
+                        next_layer.append(child)
+            layer = next_layer
+        return cls(slots, children, depth)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _child(self, slot: int, bit: int):
+        return self.children[2 * slot + bit]
+
+    def _is_leaf(self, slot: int) -> bool:
+        return self._child(slot, 0) == -1 and self._child(slot, 1) == -1
+
+    def sample_path_slots(self, rng=random, out=None, start=0) -> int:
+        """
+        Write the slots of one random route into out[start:start + depth]
+
+        Like get_path(), a route ends at a leaf, or when the chosen branch is empty.
+
+        Returns:
+        -length: The number of scenarios on the route
+        """
+        if out is None:
+            out = [-1] * self.depth
+        if not self.slots:
+            return 0
+
+        bits = rng.getrandbits(self.depth)
+        slot = 0
+        length = 0
+        while slot != -1:
+            out[start + length] = slot
+            length += 1
+            if self._is_leaf(slot):
+                break
+            slot = self._child(slot, bits & 1)
+            bits >>= 1
+        return length
+
+    def sample_path(self, rng=random) -> list:
+        """Returns the scenarios on one random route, like get_path()."""
+        out = [-1] * self.depth
+        length = self.sample_path_slots(rng, out)
+        return [self.slots[slot].data for slot in out[:length]]
+
+    def sample_paths(self, k: int, rng=random, out=None):
+        """
+        Sample k routes at once
+
+        Args:
+        -k: The number of routes
+        -rng: The random number generator to use
+        -out: An optional preallocated array of at least k * depth integers to reuse
+
+        Returns:
+        -out: An array('l') where route j is out[j * depth:(j + 1) * depth], padded with -1
+        """
+        size = k * self.depth
+        if out is None:
+            out = array("l", [-1]) * size
+        else:
+            out[:size] = array("l", [-1]) * size
+        for j in range(k):
+            self.sample_path_slots(rng, out, j * self.depth)
+        return out
+
+
+def get_game_scenarios(instances_list):
+    """
+    Create a linked list of the game scenarios
+
+    Args:
+    -instances: A list of the game scenarios
+
+    Returns:
+    -linked_list: A linked list of the game scenarios
+    """
+    try:
+        linked_list = LinkedList()
+        for instance in instances_list:
+            linked_list.append(instance)
+        return linked_list
+    except Exception as e:
+        print("List needed to be passed, please check input.", e)
+
+
+# building the tree
+catalog = ScenarioCatalog()
+root = catalog.tree()
+Node1 = root
+scenario_tree = ArrayTree.from_root(root)
@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+
+from engine import END_MESSAGES, Session, score_band
+from scenarios import scenario_tree
+
+"""
+This is the Game Server Module
+It plays many Luckometer sessions at once in one process, without pygame, for thin clients that draw the game
+themselves. Every session is an engine.Session with its own random number generator, so a session only holds
+its luck score, its route, its luck differences and how far along the route it is. The scenarios are shared by
+every session, and so is the JSON sent for each of them: a scenario is encoded once, the first time any session
+reaches it, and the same text is reused in every reply after that.
+
+Clients talk to the server over a local TCP or Unix socket in JSON Lines, one request per line and one reply
+per request, in order:
+
+- {"op": "new", "seed": 7} starts a session, the seed is optional. The reply holds the session id, its seed,
+  the luck score, the number of scenarios on the route and the first scenario.
+- {"op": "choose", "session": 1, "choice": 2} plays a choice in the session's current scenario. The reply holds
+  the outcome text, the luck change, the new score and the next scenario, or once the route is finished the
+  band and the end message instead.
+- {"op": "state", "session": 1} returns the session's screen, position and score without changing anything.
+- {"op": "close", "session": 1} ends a session. Sessions are also closed when the connection that started them
+  closes, so a client that goes away leaves nothing behind.
+
+A session can only be played, looked at or closed from the connection that started it; to any other connection
+it does not exist. A request that cannot be served gets {"error": "..."} and the connection stays open; that
+includes a line longer than MAX_REQUEST_BYTES, which is read to its end and thrown away.
+
+Example:
+python server.py --port 8765
+python server.py --unix /tmp/luckometer.sock
+python benchmarks/server_load.py --clients 50 --sessions 20000  # load test against a server of its own
+"""
+
+MAX_SESSIONS = 100_000  # open sessions, past this "new" is refused
+MAX_REQUEST_BYTES = 64 * 1024  # the longest request line read; real requests are well under 100 bytes
+TOO_LONG = object()  # returned by read_request() for a line over MAX_REQUEST_BYTES
+
+
+class RequestError(Exception):
+    """A request the server cannot serve. Its message is sent back to the client."""
+
+
+class GameServer:
+    def __init__(self, tree=scenario_tree, max_sessions=MAX_SESSIONS):
+        """
+        Args:
+        -tree: The ArrayTree the sessions' routes are sampled from
+        -max_sessions: The most sessions open at once
+        """
+        self.tree = tree
+        self.max_sessions = max_sessions
+        self.sessions = {}  # session id -> (engine.Session, its random.Random)
+        self.scenario_json = {}  # tree slot -> the scenario encoded as JSON, shared by every session
+        self._ids = itertools.count(1)
+        self.connections = 0
+        self.requests = 0
+        self.sessions_started = 0
+        self.sessions_finished = 0
+
+    def handle_line(self, line, owned: set) -> str:
+        """
+        Serve one request
+
+        Args:
+        -line: The request, one line of JSON
+        -owned: The ids of the sessions started on the connection the request came from
+
+        Returns:
+        -reply: The reply as one line of JSON, without the newline
+        """
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise RequestError("a request must be a JSON object")
+            op = request.get("op")
+            if op == "new":
+                return self.new_session(request.get("seed"), owned)
+            if op == "choose":
+                return self.choose(request.get("session"), request.get("choice"), owned)
+            if op == "state":
+                return self.state(request.get("session"), owned)
+            if op == "close":
+                self.close_session(request.get("session"), owned)
+                return json.dumps({"closed": request.get("session")})
+            raise RequestError(f"unknown op {op!r}")
+        except RequestError as error:
+            return json.dumps({"error": str(error)})
+        except ValueError as error:  # the line is not JSON
+            return json.dumps({"error": f"bad request: {error}"})
+        except Exception as error:  # a bug must not take the connection and its other sessions down with it
+            return json.dumps({"error": f"internal error: {type(error).__name__}: {error}"})
+
+    def _session(self, session_id, owned: set):
+        """Returns the (Session, rng) of session_id if it was started on the connection owning the ids in owned."""
+        if type(session_id) is not int or session_id not in owned:
+            raise RequestError(f"no session {session_id!r}")
+        return self.sessions[session_id]
+
+    def _reply(self, fields: dict, session: Session) -> str:
+        """Encodes fields plus the session's current scenario, spliced in from the shared encoded scenarios."""
+        if session.finished:
+            return json.dumps(fields)
+        slot = session.route[session.position]
+        scenario = self.scenario_json.get(slot)
+        if scenario is None:
+            data = self.tree.slots[slot].data
+            scenario = self.scenario_json[slot] = json.dumps(
+                {
+                    "scene": data.scene_num,
+                    "picture": data.picture_path,
+                    "caption": data.caption,
+                    "choices": [data.cases["choice1"], data.cases["choice2"]],
+                }
+            )
+        return f'{json.dumps(fields)[:-1]}, "scenario": {scenario}}}'
+
+    def new_session(self, seed, owned: set) -> str:
+        if len(self.sessions) >= self.max_sessions:
+            raise RequestError("too many sessions")
+        if seed is None:
+            seed = random.getrandbits(32)
+        elif type(seed) is not int:  # not bool, which is an int to isinstance()
+            raise RequestError("seed must be an integer")
+        rng = random.Random(seed)
+        session = Session(self.tree, rng)
+        session_id = next(self._ids)
+        self.sessions[session_id] = (session, rng)
+        owned.add(session_id)
+        self.sessions_started += 1
+        fields = {"session": session_id, "seed": seed, "score": session.luck_score, "length": len(session)}
+        return self._reply(fields, session)
+
+    def choose(self, session_id, choice, owned: set) -> str:
+        session, rng = self._session(session_id, owned)
+        if type(choice) is not int or choice not in (1, 2):  # true and 1.0 compare equal to 1
+            raise RequestError("choice must be 1 or 2")
+        if session.finished:
+            raise RequestError(f"session {session_id} is finished")
+        outcome, luck_change = session.choose(choice, rng)
+        fields = {"session": session_id, "outcome": outcome, "luck_change": luck_change, "score": session.luck_score}
+        if session.finished:
+            band = score_band(session.luck_score)
+            fields.update(band=band, message=END_MESSAGES[band])
+            self.sessions_finished += 1
+        return self._reply(fields, session)
+
+    def state(self, session_id, owned: set) -> str:
+        session, _ = self._session(session_id, owned)
+        screen = "end" if session.finished else f"scenario{session.position + 1}"
+        fields = {"session": session_id, "screen": screen, "position": session.position, "score": session.luck_score}
+        return self._reply(fields, session)
+
+    def close_session(self, session_id, owned: set) -> None:
+        self._session(session_id, owned)
+        del self.sessions[session_id]
+        owned.discard(session_id)
+        return None
+
+    @staticmethod
+    async def read_request(reader):
+        """Returns the next line from reader, b"" once the client has closed, or TOO_LONG for an oversized line."""
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial  # the last line had no newline, or nothing was left
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+        while True:  # throw the line away a buffer at a time, without ever holding all of it
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b"\n")
+                return TOO_LONG
+            except asyncio.IncompleteReadError:
+                return b""  # the client closed in the middle of the line
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+
+    async def serve_client(self, reader, writer) -> None:
+        """Serves one connection until the client closes it, then closes the sessions it started."""
+        self.connections += 1
+        owned = set()
+        try:
+            while True:
+                line = await self.read_request(reader)
+                if line is TOO_LONG:
+                    self.requests += 1
+                    reply = json.dumps({"error": f"request longer than {MAX_REQUEST_BYTES} bytes"})
+                elif not line:
+                    break
+                elif not line.strip():
+                    continue
+                else:
+                    reply = self.handle_line(line, owned)
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # the client went away without closing; its sessions are dropped below
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            self.connections -= 1
+            writer.close()
+        return None
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """Starts listening on host and port, or on the Unix socket path if it is given, and returns the server."""
+        if path:
+            return await asyncio.start_unix_server(self.serve_client, path=path, limit=MAX_REQUEST_BYTES)
+        return await asyncio.start_server(self.serve_client, host, port, limit=MAX_REQUEST_BYTES)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "open_sessions": len(self.sessions),
+            "sessions_started": self.sessions_started,
+            "sessions_finished": self.sessions_finished,
+            "requests": self.requests,
+            "scenarios_encoded": len(self.scenario_json),
+        }
+
+
+async def main(host: str, port: int, path=None, max_sessions=MAX_SESSIONS) -> None:
+    game_server = GameServer(max_sessions=max_sessions)
+    server = await game_server.start(host, port, path)
+    print(f"serving on {path or f'{host}:{port}'}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve many headless Luckometer sessions over a local socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.unix, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
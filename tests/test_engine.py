@@ -0,0 +1,106 @@
+import itertools
+import random
+from fractions import Fraction
+
+import pytest
+
+from engine import START_SCORE_RANGE, ExactDistribution, simulate
+from scenarios import Scenario, TreeNode
+
+
+def make_tree(luck_ranges: dict, edges: dict):
+    """Returns the root of a tree of TreeNodes holding Scenarios numbered 1 up, with the given luck_ranges."""
+    nodes = {}
+    for number, luck_range in luck_ranges.items():
+        scenario = Scenario(number, f"scenario{number}.png", luck_range)
+        scenario.set_cases("caption", "left", "good", "bad", "right", "good", "bad")
+        nodes[number] = TreeNode(scenario)
+    for parent, (left, right) in edges.items():
+        nodes[parent].left = nodes.get(left)
+        nodes[parent].right = nodes.get(right)
+    return nodes[1]
+
+
+def enumerate_scores(root) -> dict:
+    """Returns {final score: probability} by walking every route, luck_diff, outcome and starting score."""
+    routes = []  # (probability, scenarios) of every route get_path() can take
+
+    def walk(node, probability, path):
+        path = path + [node.data]
+        if node.left is None and node.right is None:
+            routes.append((probability, path))
+            return
+        for child in (node.left, node.right):
+            if child is None:
+                routes.append((probability / 2, path))
+            else:
+                walk(child, probability / 2, path)
+
+    walk(root, Fraction(1), [])
+    low, high = START_SCORE_RANGE
+    starts = range(low, high + 1)
+    pmf = {}
+    for probability, path in routes:
+        changes = [
+            [sign * luck_diff for luck_diff in range(s.luck_range[0], s.luck_range[1] + 1) for sign in (1, -1)]
+            for s in path
+        ]
+        weight = probability / len(starts) / Fraction(2) ** len(path)
+        for s in path:
+            weight /= s.luck_range[1] - s.luck_range[0] + 1
+        for start, steps in itertools.product(starts, itertools.product(*changes)):
+            score = start + sum(steps)
+            pmf[score] = pmf.get(score, 0) + weight
+    return pmf
+
+
+# a small uneven tree: nodes 2 and 3 have only a left child, node 4 only a right one, which can draw a luck_diff of 0
+LUCK_RANGES = {1: (1, 3), 2: (2, 2), 3: (1, 2), 4: (0, 4), 5: (3, 5), 6: (1, 1)}
+EDGES = {1: (2, 3), 2: (4, None), 3: (5, None), 4: (None, 6)}
+
+
+def test_exact_distribution_matches_enumeration():
+    root = make_tree(LUCK_RANGES, EDGES)
+    expected = enumerate_scores(root)
+    actual = ExactDistribution(root).pmf()
+    assert set(actual) == {score for score, probability in expected.items() if probability}
+    for score, probability in expected.items():
+        assert actual[score] == pytest.approx(float(probability), abs=1e-12)
+
+
+def test_set_luck_diff_matches_fresh_build():
+    root = make_tree(LUCK_RANGES, EDGES)
+    exact = ExactDistribution(root)
+    pinned = root.left.left  # scenario 4
+    exact.set_luck_diff(pinned.data, 3)
+
+    fresh_root = make_tree({**LUCK_RANGES, 4: (3, 3)}, EDGES)
+    fresh = ExactDistribution(fresh_root)
+    assert exact.pmf().keys() == fresh.pmf().keys()
+    for score, probability in fresh.pmf().items():
+        assert exact.pmf()[score] == pytest.approx(probability, abs=1e-12)
+    assert exact.mean() == pytest.approx(fresh.mean())
+
+
+def test_set_luck_diff_does_not_change_the_scenario():
+    root = make_tree(LUCK_RANGES, {1: (2, 3)})
+    luck_diff = root.left.data.luck_diff
+    ExactDistribution(root).set_luck_diff(root.left, 7)
+    assert root.left.data.luck_diff == luck_diff
+
+
+def test_simulate_agrees_with_exact_distribution():
+    root = make_tree(LUCK_RANGES, EDGES)
+    result = simulate(40_000, seed=3, root=root)
+    exact = ExactDistribution(root)
+    assert result["mean"] == pytest.approx(exact.mean(), abs=0.1)
+    for band, probability in exact.band_probabilities().items():
+        assert result["bands"][band] / result["games"] == pytest.approx(probability, abs=0.01)
+
+
+def test_simulate_depends_only_on_the_seed():
+    root = make_tree(LUCK_RANGES, {1: (2, 3)})
+    first = simulate(2000, seed=1, root=root)
+    for scenario in (root.data, root.left.data, root.right.data):
+        scenario.draw_luck_diff(random.Random())  # what a game session does to the shared scenarios
+    assert simulate(2000, seed=1, root=root) == first
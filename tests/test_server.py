@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import pytest
+
+from server import MAX_REQUEST_BYTES, GameServer
+
+
+def send(server: GameServer, request, owned: set) -> dict:
+    line = request if isinstance(request, str) else json.dumps(request)
+    return json.loads(server.handle_line(line, owned))
+
+
+def new_session(server: GameServer, owned: set, seed=7) -> dict:
+    reply = send(server, {"op": "new", "seed": seed}, owned)
+    assert "error" not in reply
+    return reply
+
+
+def test_plays_a_session_to_the_end():
+    server, owned = GameServer(), set()
+    reply = new_session(server, owned)
+    session, score = reply["session"], reply["score"]
+    for _ in range(reply["length"]):
+        assert "scenario" in reply
+        reply = send(server, {"op": "choose", "session": session, "choice": 1}, owned)
+        assert reply["score"] == score + reply["luck_change"]
+        score = reply["score"]
+    assert "scenario" not in reply and reply["band"] in ("lucky", "neutral", "unlucky")
+    assert send(server, {"op": "state", "session": session}, owned)["screen"] == "end"
+    assert "error" in send(server, {"op": "choose", "session": session, "choice": 1}, owned)
+
+
+def test_same_seed_same_session():
+    first = new_session(GameServer(), set(), seed=42)
+    second = new_session(GameServer(), set(), seed=42)
+    assert first == second
+
+
+@pytest.mark.parametrize(
+    "request_line",
+    [
+        "not json",
+        "[1, 2]",
+        '{"op": "fly"}',
+        '{"op": "state", "session": [1]}',
+        '{"op": "close", "session": {}}',
+        '{"op": "state", "session": "1"}',
+        '{"op": "state", "session": 99}',
+        '{"op": "new", "seed": true}',
+        '{"op": "new", "seed": "7"}',
+    ],
+)
+def test_malformed_requests_get_an_error(request_line):
+    server, owned = GameServer(), set()
+    session = new_session(server, owned)["session"]
+    assert "error" in send(server, request_line, owned)
+    assert send(server, {"op": "state", "session": session}, owned)["position"] == 0
+
+
+@pytest.mark.parametrize("choice", [True, 1.0, 3, "1", None])
+def test_bad_choices_leave_the_session_alone(choice):
+    server, owned = GameServer(), set()
+    session = new_session(server, owned)["session"]
+    before = send(server, {"op": "state", "session": session}, owned)
+    assert "error" in send(server, {"op": "choose", "session": session, "choice": choice}, owned)
+    assert send(server, {"op": "state", "session": session}, owned) == before
+
+
+def test_sessions_belong_to_their_connection():
+    server, mine, theirs = GameServer(), set(), set()
+    session = new_session(server, mine)["session"]
+    assert "error" in send(server, {"op": "choose", "session": session, "choice": 1}, theirs)
+    assert "error" in send(server, {"op": "close", "session": session}, theirs)
+    assert send(server, {"op": "state", "session": session}, mine)["position"] == 0
+
+
+def test_refuses_sessions_past_the_limit():
+    server, owned = GameServer(max_sessions=1), set()
+    session = new_session(server, owned)["session"]
+    assert send(server, {"op": "new"}, owned) == {"error": "too many sessions"}
+    send(server, {"op": "close", "session": session}, owned)
+    new_session(server, owned)
+
+
+def test_connection_survives_bad_requests_and_its_sessions_close_with_it():
+    async def scenario():
+        game_server = GameServer()
+        server = await game_server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+
+        async def request(line):
+            writer.write(line.encode() + b"\n")
+            return json.loads(await reader.readline())
+
+        session = (await request('{"op": "new", "seed": 1}'))["session"]
+        for line in ('{"op": "state", "session": [1]}', '{"op": "choose", "session": 1, "choice": true}', "{"):
+            assert "error" in await request(line)
+        assert (await request(json.dumps({"op": "state", "session": session})))["position"] == 0
+        assert len(game_server.sessions) == 1
+
+        writer.close()
+        await writer.wait_closed()
+        for _ in range(100):  # the server notices the closed connection on its next read
+            if not game_server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        server.close()
+        await server.wait_closed()
+        return game_server
+
+    game_server = asyncio.run(scenario())
+    assert game_server.sessions == {} and game_server.connections == 0
+
+
+def test_oversized_requests_are_skipped_and_answered():
+    async def scenario():
+        game_server = GameServer()
+        server = await game_server.start("127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+
+        async def request(line):
+            writer.write(line.encode() + b"\n")
+            return json.loads(await reader.readline())
+
+        session = (await request('{"op": "new", "seed": 1}'))["session"]
+        for size in (MAX_REQUEST_BYTES + 1, 8 * MAX_REQUEST_BYTES):
+            padded = json.dumps({"op": "state", "session": session, "pad": "x" * size})
+            assert "longer than" in (await request(padded))["error"]
+            assert (await request(json.dumps({"op": "state", "session": session})))["position"] == 0
+
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())